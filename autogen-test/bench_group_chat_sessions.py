@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Sequence
+
+from autogen_core import SingleThreadedAgentRuntime
+from autogen_core.models import LLMMessage
+
+from group_chat_sessions import GroupChatSessionManager
+from human_input import AutoApproveInputChannel
+from mock_model_client import MockChatCompletionClient
+from render_sink import RenderSink
+from test_group_chat_agent import (
+    group_chat_topic_type,
+    register_group_chat,
+    story_task,
+)
+
+
+def respond(messages: Sequence[LLMMessage]) -> str:
+    system = str(messages[0].content)
+    if system.startswith("You are an Editor"):
+        return "APPROVED. The draft reads well."
+    if system.startswith("You are a Writer"):
+        return "Once upon a time a gingerbread man ran away from the baker."
+    if "select the next role" in system:
+        return "Writer"
+    return "Summary of the story so far."
+
+
+async def main(sessions: int, max_concurrent: int, latency: float) -> None:
+    runtime = SingleThreadedAgentRuntime()
+    model_client = MockChatCompletionClient(respond=respond, latency=latency)
+    manager = GroupChatSessionManager(
+        runtime,
+        group_chat_topic_type,
+        story_task,
+        max_concurrent_sessions=max_concurrent,
+        session_timeout=60.0,
+    )
+    speaker_selector = await register_group_chat(
+        runtime,
+        model_client_factory=lambda: model_client,
+        image_client_factory=lambda: None,  # type: ignore
+        input_channel=AutoApproveInputChannel(),
+        sessions=manager,
+        # Rendering disabled entirely, the benchmark only measures the chat.
+        render_sink=RenderSink(rich=False),
+    )
+    runtime.start()
+
+    start = time.perf_counter()
+    results = await manager.run_sessions(
+        f"Please write short story #{i} about the gingerbread man."
+        for i in range(sessions)
+    )
+    elapsed = time.perf_counter() - start
+    await runtime.stop_when_idle()
+
+    print(Counter(result.status for result in results))
+    print(f"{sessions} sessions in {elapsed:.2f}s")
+    print(f"Throughput: {manager.sessions_per_minute():.1f} sessions/minute")
+    print(f"Model calls: {model_client.calls}")
+    print(speaker_selector.stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run many mocked story sessions over one runtime."
+    )
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--max-concurrent", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.max_concurrent, args.latency))
@@ -0,0 +1,74 @@
+import time
+from typing import List
+
+from autogen_core.models import UserMessage
+
+from group_chat_transcript import SELECTOR_PROMPT, GroupChatTranscript, format_message
+
+participant_topic_types = ["Writer", "Editor", "User"]
+participant_descriptions = [
+    "Writer for creating any text content.",
+    "Editor for planning and reviewing the content.",
+    "User for providing final approval.",
+]
+
+
+def rebuild_prompt(chat_history: List[UserMessage], previous: str | None) -> str:
+    # What GroupChatManager used to do on every turn.
+    history = "\n".join(format_message(msg) for msg in chat_history)
+    roles = "\n".join(
+        [
+            f"{topic_type}: {description}".strip()
+            for topic_type, description in zip(
+                participant_topic_types, participant_descriptions, strict=True
+            )
+            if topic_type != previous
+        ]
+    )
+    participants = str(
+        [topic_type for topic_type in participant_topic_types if topic_type != previous]
+    )
+    return SELECTOR_PROMPT.format(
+        roles=roles, history=history, participants=participants
+    )
+
+
+def main() -> None:
+    checkpoints = {5, 50, 500, 2000, 5000}
+    # Each checkpoint reports the mean over the turns leading up to it.
+    window = 5
+    chat_history: List[UserMessage] = []
+    transcript = GroupChatTranscript(participant_topic_types, participant_descriptions)
+    rebuild = turn_cost = 0.0
+    print(f"{'turn':>6} {'rebuild (us)':>14} {'append + render (us)':>22}")
+    for turn in range(1, max(checkpoints) + 1):
+        source = participant_topic_types[turn % len(participant_topic_types)]
+        message = UserMessage(
+            content=f"Turn {turn}: the gingerbread man runs on. " * 4, source=source
+        )
+        chat_history.append(message)
+        if not any(0 <= checkpoint - turn < window for checkpoint in checkpoints):
+            transcript.append(message)
+            continue
+
+        start = time.perf_counter()
+        rebuild_prompt(chat_history, source)
+        rebuild += time.perf_counter() - start
+
+        # What GroupChatManager does per turn: one append, one render.
+        start = time.perf_counter()
+        transcript.append(message)
+        transcript.render_selector_prompt(source)
+        turn_cost += time.perf_counter() - start
+
+        if turn in checkpoints:
+            samples = min(window, turn)
+            print(
+                f"{turn:>6} {rebuild / samples * 1e6:>14.1f} "
+                f"{turn_cost / samples * 1e6:>22.1f}"
+            )
+            rebuild = turn_cost = 0.0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from autogen_core import SingleThreadedAgentRuntime, TopicId
+
+from mock_model_client import MockChatCompletionClient
+from test_sequential_workflow import (
+    Message,
+    concept_extractor_topic_type,
+    make_stages,
+    register_agents,
+)
+
+
+async def run(items: int, latency: float, stream: bool) -> None:
+    runtime = SingleThreadedAgentRuntime()
+    stages = make_stages()
+    published: Dict[str, float] = {}
+    first_output: List[float] = []
+    done: List[float] = []
+
+    def on_first_output(source: str) -> None:
+        first_output.append(time.perf_counter() - published[source])
+
+    def on_final_copy(source: str, content: str) -> None:
+        done.append(time.perf_counter() - published[source])
+
+    await register_agents(
+        runtime,
+        stages,
+        on_final_copy=on_final_copy,
+        verbose=False,
+        client=MockChatCompletionClient(
+            respond=lambda messages: "Crisp, cold and plastic-free. " * 20,
+            latency=latency,
+            stream_chunks=16,
+        ),
+        stream=stream,
+        on_first_output=on_first_output,
+    )
+    runtime.start()
+    for index in range(items):
+        source = f"item-{index}"
+        await stages[concept_extractor_topic_type].admit()
+        published[source] = time.perf_counter()
+        await runtime.publish_message(
+            Message(content=f"Water bottle #{index}", item_id=source),
+            topic_id=TopicId(concept_extractor_topic_type, source=source),
+        )
+    await runtime.stop_when_idle()
+
+    mode = "streaming" if stream else "buffered"
+    print(
+        f"{mode:<10} first output {sum(first_output) / len(first_output):.2f}s, "
+        f"final copy {sum(done) / len(done):.2f}s (mean of {items} items)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare time to first output with and without streaming."
+    )
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.latency, stream=False))
+    asyncio.run(run(args.items, args.latency, stream=True))
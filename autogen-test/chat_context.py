@@ -0,0 +1,161 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Sequence
+
+from autogen_core import CancellationToken, Image
+from autogen_core.models import (
+    ChatCompletionClient,
+    LLMMessage,
+    SystemMessage,
+    UserMessage,
+)
+
+# Rough cost of an image in a request, in the same units as estimate_tokens.
+IMAGE_TOKENS = 85
+
+
+def message_text(message: LLMMessage) -> str:
+    """Flatten a message to plain text, skipping images and tool calls."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(item for item in content if isinstance(item, str))  # type: ignore
+
+
+def estimate_tokens(message: LLMMessage) -> int:
+    """Cheap token estimate (~4 characters per token) used for the budget."""
+    tokens = len(message_text(message)) // 4 + 4
+    if isinstance(message.content, list):
+        tokens += IMAGE_TOKENS * sum(
+            isinstance(item, Image) for item in message.content
+        )
+    return tokens
+
+
+@dataclass
+class ContextPolicy:
+    """How much chat history a participant sends with each request.
+
+    max_messages: keep at most this many of the most recent messages.
+    max_tokens: keep the most recent messages that fit in this token budget.
+    summarize: roll evicted messages into a running summary instead of
+        dropping them. Eviction then trims down to ``summarize_watermark`` of
+        the limits so a summary is only produced every few turns.
+    """
+
+    max_messages: int | None = None
+    max_tokens: int | None = None
+    summarize: bool = False
+    summarize_watermark: float = 0.5
+
+
+class ChatContext:
+    """Chat history bounded by a ContextPolicy.
+
+    Token counts are computed once per message when it is added, so trimming
+    and building a request only depend on the size of the window.
+    """
+
+    def __init__(
+        self,
+        policy: ContextPolicy | None = None,
+        count_tokens: Callable[[LLMMessage], int] = estimate_tokens,
+    ) -> None:
+        self._policy = policy or ContextPolicy()
+        self._count_tokens = count_tokens
+        self._messages: Deque[LLMMessage] = deque()
+        self._message_tokens: Deque[int] = deque()
+        self._total_tokens = 0
+        self._evicted: List[LLMMessage] = []
+        self._summary: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def total_tokens(self) -> int:
+        return self._total_tokens
+
+    @property
+    def summary(self) -> str | None:
+        return self._summary
+
+    def append(self, message: LLMMessage) -> None:
+        tokens = self._count_tokens(message)
+        self._messages.append(message)
+        self._message_tokens.append(tokens)
+        self._total_tokens += tokens
+        self._trim()
+
+    def extend(self, messages: Sequence[LLMMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def _over(self, scale: float) -> bool:
+        policy = self._policy
+        if policy.max_messages is not None and len(self._messages) > int(
+            policy.max_messages * scale
+        ):
+            return True
+        if policy.max_tokens is not None and self._total_tokens > int(
+            policy.max_tokens * scale
+        ):
+            return True
+        return False
+
+    def _trim(self) -> None:
+        if not self._over(1.0):
+            return
+        scale = self._policy.summarize_watermark if self._policy.summarize else 1.0
+        # Always keep the latest message, even if it alone exceeds the budget.
+        while len(self._messages) > 1 and self._over(scale):
+            message = self._messages.popleft()
+            self._total_tokens -= self._message_tokens.popleft()
+            if self._policy.summarize:
+                self._evicted.append(message)
+
+    async def _roll_summary(
+        self,
+        model_client: ChatCompletionClient,
+        cancellation_token: CancellationToken | None,
+    ) -> None:
+        transcript = "\n".join(
+            f"{getattr(message, 'source', 'system')}: {message_text(message)}"
+            for message in self._evicted
+        )
+        previous = f"Summary so far:\n{self._summary}\n\n" if self._summary else ""
+        completion = await model_client.create(
+            [
+                SystemMessage(
+                    content="Summarize the conversation below in a short paragraph. "
+                    "Keep decisions, requirements and open feedback."
+                ),
+                UserMessage(
+                    content=f"{previous}New messages:\n{transcript}", source="system"
+                ),
+            ],
+            cancellation_token=cancellation_token,
+        )
+        assert isinstance(completion.content, str)
+        self._summary = completion.content
+        self._evicted.clear()
+
+    async def messages(
+        self,
+        system_message: SystemMessage,
+        model_client: ChatCompletionClient,
+        cancellation_token: CancellationToken | None = None,
+    ) -> List[LLMMessage]:
+        """Build the request: system message, optional summary, then the window."""
+        if self._evicted:
+            await self._roll_summary(model_client, cancellation_token)
+        messages: List[LLMMessage] = [system_message]
+        if self._summary is not None:
+            messages.append(
+                UserMessage(
+                    content=f"Summary of the earlier conversation:\n{self._summary}",
+                    source="system",
+                )
+            )
+        messages.extend(self._messages)
+        return messages
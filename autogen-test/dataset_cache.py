@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+
+# Datasets the agents work with, by name.
+DATASETS: Dict[str, str] = {
+    "titanic": "https://raw.githubusercontent.com/pandas-dev/pandas/main/doc/data/titanic.csv",
+}
+
+
+class DatasetCache:
+    """Fetch datasets once and keep them as uncompressed Arrow IPC files.
+
+    The first ``path(name)`` downloads the CSV, converts it and writes
+    ``<cache_dir>/<name>.arrow``; afterwards no network is needed. Reads
+    memory-map the file, so numeric columns without nulls are zero-copy and
+    repeated loads cost milliseconds. ``materialize`` copies the file into an
+    executor's working directory so sandboxed code can map it too.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = ".datasets",
+        datasets: Dict[str, str] = DATASETS,
+    ) -> None:
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._datasets = dict(datasets)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, url: str) -> None:
+        self._datasets[name] = url
+
+    def _fetch(self, name: str, path: Path) -> None:
+        url = self._datasets[name]
+        response = httpx.get(url, follow_redirects=True, timeout=60.0)
+        response.raise_for_status()
+        table = pa_csv.read_csv(io.BytesIO(response.content))
+        tmp_path = path.with_suffix(".arrow.tmp")
+        # Uncompressed, otherwise reads can't be memory-mapped.
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        meta: Dict[str, Any] = {
+            "url": url,
+            "fetched_at": time.time(),
+            "rows": table.num_rows,
+            "columns": table.column_names,
+        }
+        path.with_suffix(".json").write_text(json.dumps(meta, indent=2))
+
+    def path(self, name: str) -> Path:
+        """Local Arrow file for ``name``, fetched on first use."""
+        if name not in self._datasets:
+            raise KeyError(f"Unknown dataset: {name}")
+        path = self._cache_dir / f"{name}.arrow"
+        with self._lock:
+            if not path.exists():
+                self._fetch(name, path)
+        return path
+
+    def table(self, name: str) -> pa.Table:
+        return feather.read_table(self.path(name), memory_map=True)
+
+    def load(self, name: str) -> pd.DataFrame:
+        return self.table(name).to_pandas(split_blocks=True)
+
+    def materialize(self, name: str, work_dir: str | Path) -> Path:
+        """Make ``name`` available as ``<work_dir>/<name>.arrow``.
+
+        A read-only copy rather than a link: generated code runs in
+        ``work_dir``, and a write through a hard link would corrupt the cache
+        for every later run. The copy is refreshed when the cached file
+        changes, e.g. after a re-fetch.
+        """
+        source = self.path(name)
+        target = Path(work_dir) / source.name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        stat = source.stat()
+        if target.exists():
+            copied = target.stat()
+            if (copied.st_size, copied.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                return target
+        tmp_path = target.with_suffix(".arrow.tmp")
+        shutil.copy2(source, tmp_path)
+        tmp_path.chmod(0o444)
+        os.replace(tmp_path, target)
+        return target
+
+    @staticmethod
+    def load_snippet(name: str, variable: str = "df") -> str:
+        """Code that loads a materialized dataset in an executor."""
+        return (
+            "import pyarrow.feather as feather\n"
+            f"{variable} = feather.read_table({name + '.arrow'!r}, "
+            "memory_map=True).to_pandas(split_blocks=True)\n"
+        )
+
+
+_default_cache: DatasetCache | None = None
+
+
+def default_dataset_cache() -> DatasetCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DatasetCache()
+    return _default_cache
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Pattern, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock, CodeExecutor, CodeResult
+
+DEFAULT_CACHE_DIR = ".execution_cache"
+
+# Code whose output depends on more than its source and input files. Blocks
+# matching any of these always run.
+IMPURE_PATTERNS: Sequence[str] = (
+    # Network
+    r"\b(requests|httpx|urllib|urllib3|aiohttp|socket|http\.client|ftplib)\b",
+    r"\b(curl|wget|pip|apt-get|apt|git)\s",
+    r"https?://",
+    # Clock and randomness
+    r"\b(datetime|time)\.(now|today|utcnow|time|time_ns|monotonic|perf_counter)\b",
+    r"\b(random|secrets|uuid)\b",
+    r"\bnp\.random\b",
+    r"\bdate\s",
+    # Environment outside the working directory
+    r"\b(os\.environ|getenv|subprocess|psutil)\b",
+)
+
+# Put this in a code block to never cache it.
+NO_CACHE_MARKER = "no-cache"
+
+# Written by the Docker and local command-line executors for each block.
+_SCRIPT_FILE = re.compile(r"^tmp_code_[0-9a-f]+\.\w+$")
+
+
+@dataclass
+class ExecutionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Execution cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.0%} hit rate), {self.bypassed} not cacheable"
+        )
+
+
+def _fingerprint(work_dir: Path) -> Dict[str, str]:
+    """Content hash of every file in ``work_dir`` by relative path."""
+    files: Dict[str, str] = {}
+    for path in sorted(work_dir.rglob("*")):
+        if not path.is_file() or _SCRIPT_FILE.match(path.name):
+            continue
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        files[path.relative_to(work_dir).as_posix()] = digest.hexdigest()
+    return files
+
+
+class ExecutionCache:
+    """Results of code runs on disk, one directory per key.
+
+    Each entry holds ``result.json`` (exit code, output and the files the run
+    deleted) and the files the run created or changed under ``artifacts/``. Entries are written to a
+    temporary directory and renamed into place, so concurrent writers of the
+    same key are safe.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self.stats = ExecutionCacheStats()
+
+    def get(self, key: str, work_dir: Path) -> CodeResult | None:
+        entry = self._directory / key
+        try:
+            result = json.loads((entry / "result.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        artifacts = entry / "artifacts"
+        for name in result["artifacts"]:
+            target = work_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(artifacts / name, target)
+        for name in result.get("deleted", []):
+            (work_dir / name).unlink(missing_ok=True)
+        return CodeResult(exit_code=result["exit_code"], output=result["output"])
+
+    def put(
+        self,
+        key: str,
+        result: CodeResult,
+        work_dir: Path,
+        artifacts: List[str],
+        deleted: List[str],
+    ) -> None:
+        entry = self._directory / key
+        if entry.exists():
+            return
+        tmp_entry = self._directory / f".{key}.{uuid.uuid4().hex}"
+        for name in artifacts:
+            target = tmp_entry / "artifacts" / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(work_dir / name, target)
+        tmp_entry.mkdir(parents=True, exist_ok=True)
+        (tmp_entry / "result.json").write_text(
+            json.dumps(
+                {
+                    "exit_code": result.exit_code,
+                    "output": result.output,
+                    "artifacts": artifacts,
+                    "deleted": deleted,
+                }
+            ),
+            encoding="utf-8",
+        )
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another run stored the same key first.
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+    def clear(self) -> None:
+        shutil.rmtree(self._directory, ignore_errors=True)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+
+class CachingCodeExecutor(CodeExecutor):
+    """Return stored results for code that has already run on the same inputs.
+
+    The key covers the code and language of every block, the content of all
+    files in the executor's working directory and the executor's image, so a
+    hit is a run that would have produced the same output. On a hit the
+    working directory is left as the run left it: files it created or changed
+    are restored and files it deleted are removed.
+
+    Blocks that touch the network, the clock, randomness or the environment
+    (see ``IMPURE_PATTERNS``), or contain ``no-cache``, always run; so do runs
+    that time out. Pass ``enabled=False`` to turn the cache off entirely.
+
+    Only wrap executors that run each block in a fresh process (Docker, local
+    command line); a kernel that keeps variables between blocks has state the
+    key can't see.
+    """
+
+    def __init__(
+        self,
+        executor: CodeExecutor,
+        cache: ExecutionCache | None = None,
+        impure_patterns: Sequence[str] = IMPURE_PATTERNS,
+        max_artifact_bytes: int = 50 * 1024 * 1024,
+        enabled: bool = True,
+    ) -> None:
+        self._executor = executor
+        self._cache = cache if cache is not None else ExecutionCache()
+        self._impure: List[Pattern[str]] = [re.compile(p) for p in impure_patterns]
+        self._max_artifact_bytes = max_artifact_bytes
+        self._enabled = enabled
+
+    @property
+    def inner_executor(self) -> CodeExecutor:
+        return self._executor
+
+    @property
+    def stats(self) -> ExecutionCacheStats:
+        return self._cache.stats
+
+    @property
+    def work_dir(self) -> Path:
+        return Path(getattr(self._executor, "work_dir"))
+
+    def _cacheable(self, code_blocks: List[CodeBlock]) -> bool:
+        if not self._enabled or not hasattr(self._executor, "work_dir"):
+            return False
+        for block in code_blocks:
+            if NO_CACHE_MARKER in block.code:
+                return False
+            if any(pattern.search(block.code) for pattern in self._impure):
+                return False
+        return True
+
+    def _key(self, code_blocks: List[CodeBlock], inputs: Dict[str, str]) -> str:
+        payload = {
+            "blocks": [
+                [
+                    block.language.lower(),
+                    hashlib.sha256(block.code.encode()).hexdigest(),
+                ]
+                for block in code_blocks
+            ],
+            "inputs": inputs,
+            "executor": type(self._executor).__name__,
+            "image": getattr(self._executor, "_image", None),
+        }
+        encoded = json.dumps(payload, sort_keys=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _artifacts(self, before: Dict[str, str], after: Dict[str, str]) -> List[str]:
+        return [name for name, digest in after.items() if before.get(name) != digest]
+
+    async def execute_code_blocks(
+        self, code_blocks: List[CodeBlock], cancellation_token: CancellationToken
+    ) -> CodeResult:
+        if not self._cacheable(code_blocks):
+            self.stats.bypassed += 1
+            return await self._executor.execute_code_blocks(
+                code_blocks, cancellation_token
+            )
+
+        work_dir = self.work_dir
+        before = await asyncio.to_thread(_fingerprint, work_dir)
+        key = self._key(code_blocks, before)
+        cached = await asyncio.to_thread(self._cache.get, key, work_dir)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+
+        self.stats.misses += 1
+        result = await self._executor.execute_code_blocks(
+            code_blocks, cancellation_token
+        )
+        # Timeouts and cancellations say nothing about the code itself.
+        if result.exit_code == 124 or cancellation_token.is_cancelled():
+            return result
+        after = await asyncio.to_thread(_fingerprint, work_dir)
+        artifacts = self._artifacts(before, after)
+        deleted = [name for name in before if name not in after]
+        size = sum((work_dir / name).stat().st_size for name in artifacts)
+        if size <= self._max_artifact_bytes:
+            await asyncio.to_thread(
+                self._cache.put, key, result, work_dir, artifacts, deleted
+            )
+        return result
+
+    async def start(self) -> None:
+        await self._executor.start()
+
+    async def stop(self) -> None:
+        await self._executor.stop()
+
+    async def restart(self) -> None:
+        await self._executor.restart()
+
+
+_caches: Dict[str, ExecutionCache] = {}
+
+
+def execution_cache(directory: str | Path = DEFAULT_CACHE_DIR) -> ExecutionCache:
+    """The process-wide cache stored in ``directory``."""
+    key = str(Path(directory).resolve())
+    if key not in _caches:
+        _caches[key] = ExecutionCache(directory)
+    return _caches[key]
+
+
+def caching_executor(
+    executor: CodeExecutor,
+    directory: str | Path = DEFAULT_CACHE_DIR,
+    **kwargs: Any,
+) -> CodeExecutor:
+    """Wrap ``executor`` with the process-wide cache stored in ``directory``.
+
+    Extra keyword arguments are passed to ``CachingCodeExecutor``. Set
+    ``AUTOGEN_EXECUTION_CACHE=0`` to run every block.
+    """
+    if os.environ.get("AUTOGEN_EXECUTION_CACHE", "1") == "0":
+        return executor
+    return CachingCodeExecutor(executor, execution_cache(directory), **kwargs)
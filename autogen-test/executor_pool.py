@@ -0,0 +1,274 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Set, Tuple
+
+from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock
+from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
+
+logger = logging.getLogger(__name__)
+
+# Runs inside the container between leases: kill everything the last task left
+# running (except the container's shell, this script and its `timeout`
+# parent), then empty the working directory.
+RESET_SCRIPT = """\
+for proc in /proc/[0-9]*; do
+  pid=${proc#/proc/}
+  case "$pid" in
+    1|$$|$PPID) ;;
+    *) kill -9 "$pid" 2>/dev/null ;;
+  esac
+done
+find /workspace -mindepth 1 -delete
+"""
+
+
+@dataclass
+class ExecutorPoolStats:
+    leases: int = 0
+    started: int = 0
+    discarded: int = 0
+    wait_time: float = 0.0
+    reset_time: float = 0.0
+    resets: int = 0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.wait_time / self.leases if self.leases else 0.0
+
+    @property
+    def mean_reset(self) -> float:
+        return self.reset_time / self.resets if self.resets else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Executor pool: {self.leases} leases, {self.started} containers "
+            f"started, {self.discarded} discarded, mean wait {self.mean_wait:.3f}s, "
+            f"mean reset {self.mean_reset:.3f}s"
+        )
+
+
+class DockerExecutorPool:
+    """Running Docker code executors that are leased out one task at a time.
+
+    ``start`` brings up ``min_size`` containers, each with its own working
+    directory under ``work_root``. While tasks are waiting for a lease and
+    there are fewer than ``max_size`` containers, one more is started per
+    waiting task. Containers idle for longer than ``idle_timeout`` are stopped
+    again, down to ``min_size``.
+
+    When a lease ends the container is reset in the background (stray
+    processes killed, working directory emptied) and goes back to the pool; a
+    container that fails to reset is stopped and replaced. Extra keyword
+    arguments are passed to ``DockerCommandLineCodeExecutor``.
+
+    A failed container start is retried after ``start_backoff`` seconds,
+    doubling with each consecutive failure. After ``max_start_failures`` in a
+    row no more starts are attempted, and once no container is left ``lease``
+    raises instead of waiting.
+    """
+
+    def __init__(
+        self,
+        work_root: str | Path = "coding",
+        min_size: int = 2,
+        max_size: int = 8,
+        idle_timeout: float = 300.0,
+        start_backoff: float = 1.0,
+        max_start_failures: int = 5,
+        **executor_kwargs: Any,
+    ) -> None:
+        self._work_root = Path(work_root)
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._executor_kwargs = executor_kwargs
+        self._idle: Deque[Tuple[DockerCommandLineCodeExecutor, float]] = deque()
+        self._available = asyncio.Condition()
+        self._ids = itertools.count()
+        self._size = 0
+        self._starting = 0
+        self._waiting = 0
+        self._background: Set[asyncio.Task[None]] = set()
+        self._start_backoff = start_backoff
+        self._max_start_failures = max_start_failures
+        self._start_failures = 0
+        self._start_error: BaseException | None = None
+        self._retry_at = 0.0
+        self.stats = ExecutorPoolStats()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._add() for _ in range(self._min_size)))
+
+    def _reserve(self) -> None:
+        # Counted before the start is awaited so concurrent waiters see it.
+        self._size += 1
+        self._starting += 1
+
+    def _can_start(self) -> bool:
+        return (
+            self._size < self._max_size
+            and self._start_failures < self._max_start_failures
+            and time.monotonic() >= self._retry_at
+            # After a failure, retry with one container before starting more.
+            and not (self._start_failures and self._starting)
+        )
+
+    def _spawn(self, coroutine: Any) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _add(self, reserved: bool = False) -> None:
+        if not reserved:
+            self._reserve()
+        try:
+            executor = DockerCommandLineCodeExecutor(
+                work_dir=self._work_root / f"executor-{next(self._ids)}",
+                **self._executor_kwargs,
+            )
+            await executor.start()
+        except BaseException:
+            self._size -= 1
+            raise
+        finally:
+            self._starting -= 1
+        self._start_failures = 0
+        self._start_error = None
+        self.stats.started += 1
+        await self._put(executor)
+
+    async def _add_in_background(self) -> None:
+        try:
+            await self._add(reserved=True)
+        except Exception as error:
+            logger.exception("Failed to start a pooled code executor")
+            self._start_failures += 1
+            self._start_error = error
+            self._retry_at = time.monotonic() + self._start_backoff * 2 ** (
+                self._start_failures - 1
+            )
+            # Wake the waiters so they retry after the backoff, or give up.
+            async with self._available:
+                self._available.notify_all()
+
+    async def _put(self, executor: DockerCommandLineCodeExecutor) -> None:
+        async with self._available:
+            self._idle.append((executor, time.monotonic()))
+            self._available.notify()
+
+    async def _discard(self, executor: DockerCommandLineCodeExecutor) -> None:
+        self._size -= 1
+        self.stats.discarded += 1
+        try:
+            await executor.stop()
+        except Exception:
+            logger.exception("Failed to stop a pooled code executor")
+
+    async def _acquire(self) -> DockerCommandLineCodeExecutor:
+        start = time.perf_counter()
+        async with self._available:
+            self._waiting += 1
+            try:
+                while not self._idle:
+                    if (
+                        self._start_failures >= self._max_start_failures
+                        and self._size == 0
+                    ):
+                        raise RuntimeError(
+                            f"No code executor could be started after "
+                            f"{self._start_failures} attempts"
+                        ) from self._start_error
+                    # Scale with the queue: one new container per waiting task
+                    # that isn't already covered by one that is starting.
+                    if self._can_start() and self._waiting > self._starting:
+                        self._reserve()
+                        self._spawn(self._add_in_background())
+                    backoff = self._retry_at - time.monotonic()
+                    if backoff > 0:
+                        try:
+                            await asyncio.wait_for(self._available.wait(), backoff)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await self._available.wait()
+                # Most recently used first, so the oldest idle ones can expire.
+                executor, _ = self._idle.pop()
+            finally:
+                self._waiting -= 1
+        self.stats.leases += 1
+        self.stats.wait_time += time.perf_counter() - start
+        return executor
+
+    async def _reset(self, executor: DockerCommandLineCodeExecutor) -> bool:
+        start = time.perf_counter()
+        try:
+            result = await executor.execute_code_blocks(
+                [CodeBlock(code=RESET_SCRIPT, language="sh")], CancellationToken()
+            )
+        except Exception:
+            logger.exception("Failed to reset a pooled code executor")
+            return False
+        self.stats.resets += 1
+        self.stats.reset_time += time.perf_counter() - start
+        return result.exit_code == 0
+
+    async def _release(self, executor: DockerCommandLineCodeExecutor) -> None:
+        if await self._reset(executor):
+            await self._put(executor)
+        else:
+            await self._discard(executor)
+            if (self._size < self._min_size or self._waiting) and self._can_start():
+                self._reserve()
+                await self._add_in_background()
+            else:
+                # Waiters may now have to start one, or give up.
+                async with self._available:
+                    self._available.notify_all()
+        await self._shrink()
+
+    async def _shrink(self) -> None:
+        expired = []
+        async with self._available:
+            now = time.monotonic()
+            while (
+                self._idle
+                and self._size - len(expired) > self._min_size
+                and now - self._idle[0][1] > self._idle_timeout
+            ):
+                expired.append(self._idle.popleft()[0])
+        for executor in expired:
+            await self._discard(executor)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[DockerCommandLineCodeExecutor]:
+        """Borrow a running executor for the duration of one task."""
+        executor = await self._acquire()
+        try:
+            yield executor
+        finally:
+            # The caller doesn't wait for the reset.
+            self._spawn(self._release(executor))
+
+    async def close(self) -> None:
+        while self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        async with self._available:
+            idle = [executor for executor, _ in self._idle]
+            self._idle.clear()
+        for executor in idle:
+            await self._discard(executor)
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Literal
+
+from autogen_core import AgentRuntime, TopicId
+
+
+class SessionRejected(RuntimeError):
+    """Raised when a session is not admitted because too many are waiting."""
+
+
+@dataclass
+class SessionResult:
+    session_id: str
+    status: Literal["completed", "timeout", "rejected"]
+    duration: float
+
+
+class GroupChatSessionManager:
+    """Multiplex many group chat sessions over one agent runtime.
+
+    At most ``max_concurrent_sessions`` run at once, each on one of as many
+    slots. A session publishes ``make_task_message(task, session_id)`` to
+    ``TopicId(topic_type, source=slot)``; the group chat agents are subscribed
+    by topic type, so the runtime keeps one set of agent instances per slot
+    rather than per session. Messages carry the session id: agents drop those
+    of sessions that are no longer running (see ``is_active``) and reset their
+    state when a new session starts on their slot. The group chat manager
+    reports the end of a session through ``complete``.
+
+    Sessions beyond the limit wait for a slot, and once
+    ``max_pending_sessions`` are waiting new sessions are rejected instead of
+    queued. A session that times out is marked inactive before its slot is
+    reused, so its agents stop calling the model.
+    """
+
+    def __init__(
+        self,
+        runtime: AgentRuntime,
+        topic_type: str,
+        make_task_message: Callable[[str, str], Any],
+        max_concurrent_sessions: int = 100,
+        max_pending_sessions: int | None = None,
+        session_timeout: float | None = None,
+    ) -> None:
+        self._runtime = runtime
+        self._topic_type = topic_type
+        self._make_task_message = make_task_message
+        self._free_slots: asyncio.Queue[str] = asyncio.Queue()
+        for slot in range(max_concurrent_sessions):
+            self._free_slots.put_nowait(f"slot-{slot}")
+        self._max_pending_sessions = max_pending_sessions
+        self._session_timeout = session_timeout
+        self._sessions: Dict[str, asyncio.Future[None]] = {}
+        self._pending = 0
+        self._completed = 0
+        self._started_at: float | None = None
+
+    @property
+    def active_sessions(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def pending_sessions(self) -> int:
+        return self._pending
+
+    @property
+    def completed_sessions(self) -> int:
+        return self._completed
+
+    def sessions_per_minute(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started_at
+        return self._completed / elapsed * 60 if elapsed > 0 else 0.0
+
+    def is_active(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def complete(self, session_id: str) -> None:
+        future = self._sessions.get(session_id)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    async def run_session(
+        self, task: str, session_id: str | None = None
+    ) -> SessionResult:
+        session_id = session_id or str(uuid.uuid4())
+        if (
+            self._max_pending_sessions is not None
+            and self._free_slots.empty()
+            and self._pending >= self._max_pending_sessions
+        ):
+            raise SessionRejected(f"Too many pending sessions, {session_id} rejected.")
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+
+        self._pending += 1
+        try:
+            slot = await self._free_slots.get()
+        finally:
+            self._pending -= 1
+        try:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._sessions[session_id] = future
+            start = time.perf_counter()
+            await self._runtime.publish_message(
+                self._make_task_message(task, session_id),
+                TopicId(type=self._topic_type, source=slot),
+            )
+            try:
+                await asyncio.wait_for(future, self._session_timeout)
+            except asyncio.TimeoutError:
+                return SessionResult(session_id, "timeout", time.perf_counter() - start)
+            self._completed += 1
+            return SessionResult(session_id, "completed", time.perf_counter() - start)
+        finally:
+            # Inactive before the slot is reused, so the agents drop its messages.
+            self._sessions.pop(session_id, None)
+            self._free_slots.put_nowait(slot)
+
+    async def run_sessions(self, tasks: Iterable[str]) -> List[SessionResult]:
+        async def run(task: str) -> SessionResult:
+            try:
+                return await self.run_session(task)
+            except SessionRejected:
+                return SessionResult("", "rejected", 0.0)
+
+        return list(await asyncio.gather(*[run(task) for task in tasks]))
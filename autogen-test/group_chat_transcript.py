@@ -0,0 +1,105 @@
+from typing import Dict, List, Sequence
+
+from autogen_core.models import UserMessage
+
+SELECTOR_PROMPT = """You are in a role play game. The following roles are available:
+        {roles}.
+        Read the following conversation. Then select the next role from {participants} to play. Only return the role.
+
+        {history}
+
+        Read the above conversation. Then select the next role from {participants} to play. Only return the role.
+        """
+
+
+def format_message(message: UserMessage) -> str:
+    """Render a single group chat message as a transcript line."""
+    if isinstance(message.content, str):
+        return f"{message.source}: {message.content}"
+    line: List[str] = []
+    for item in message.content:
+        if isinstance(item, str):
+            line.append(item)
+        # else:
+        #     line.append("[Image]")
+    return f"{message.source}: {', '.join(line)}"
+
+
+class GroupChatTranscript:
+    """Append-only transcript used to build the speaker selection prompt.
+
+    Every message is formatted exactly once, when it is appended, and the
+    history string is extended with the new line rather than re-joined from
+    every earlier message. The role and participant strings only depend on
+    which participant spoke last, so they are rendered up front for each
+    possible previous speaker.
+    """
+
+    def __init__(
+        self,
+        participant_topic_types: Sequence[str],
+        participant_descriptions: Sequence[str],
+    ) -> None:
+        self._lines: List[str] = []
+        self._history = ""
+        self._roles: Dict[str | None, str] = {}
+        self._participants: Dict[str | None, List[str]] = {}
+        self._prompt_parts: Dict[str | None, tuple[str, str]] = {}
+        # Split the template around the history so a prompt is a single join.
+        head, tail = SELECTOR_PROMPT.split("{history}")
+        for previous in [None, *participant_topic_types]:
+            self._roles[previous] = "\n".join(
+                [
+                    f"{topic_type}: {description}".strip()
+                    for topic_type, description in zip(
+                        participant_topic_types,
+                        participant_descriptions,
+                        strict=True,
+                    )
+                    if topic_type != previous
+                ]
+            )
+            self._participants[previous] = [
+                topic_type
+                for topic_type in participant_topic_types
+                if topic_type != previous
+            ]
+            fields = {
+                "roles": self._roles[previous],
+                "participants": str(self._participants[previous]),
+            }
+            self._prompt_parts[previous] = (
+                head.format(**fields),
+                tail.format(**fields),
+            )
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def lines(self) -> List[str]:
+        return self._lines
+
+    @property
+    def history(self) -> str:
+        return self._history
+
+    def append(self, message: UserMessage) -> str:
+        line = format_message(message)
+        # Take the only reference, so CPython can grow the string in place.
+        history, self._history = self._history, ""
+        if self._lines:
+            history += "\n"
+        history += line
+        self._history = history
+        self._lines.append(line)
+        return line
+
+    def participants(self, previous_participant_topic_type: str | None) -> List[str]:
+        return self._participants[previous_participant_topic_type]
+
+    def render_selector_prompt(
+        self, previous_participant_topic_type: str | None
+    ) -> str:
+        head, tail = self._prompt_parts[previous_participant_topic_type]
+        return "".join((head, self.history, tail))
@@ -0,0 +1,131 @@
+import asyncio
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+class HumanInputChannel(ABC):
+    """Async source of human replies for a UserAgent.
+
+    ``get_input`` waits at most ``timeout`` seconds and then falls back to
+    ``default_response``, which approves the task by default. Waiting is
+    always async, so other sessions on the runtime keep making progress.
+    """
+
+    def __init__(
+        self, timeout: float | None = None, default_response: str = "APPROVE"
+    ) -> None:
+        self._timeout = timeout
+        self._default_response = default_response
+
+    async def get_input(self, session_id: str, prompt: str) -> str:
+        try:
+            return await asyncio.wait_for(self._read(session_id, prompt), self._timeout)
+        except asyncio.TimeoutError:
+            return self._default_response
+
+    @abstractmethod
+    async def _read(self, session_id: str, prompt: str) -> str: ...
+
+
+class AutoApproveInputChannel(HumanInputChannel):
+    """Answer every request with the default response, without waiting."""
+
+    async def _read(self, session_id: str, prompt: str) -> str:
+        return self._default_response
+
+
+class ConsoleInputChannel(HumanInputChannel):
+    """Read replies from stdin, one session at a time.
+
+    Requests are queued and a single reader shows each prompt and passes the
+    typed line back to the session that asked, so concurrent sessions are
+    answered one by one. Share one channel between all sessions. A blocked
+    ``input()`` can't be cancelled, so a line typed after the session stopped
+    waiting is kept as that session's next reply.
+    """
+
+    def __init__(
+        self, timeout: float | None = None, default_response: str = "APPROVE"
+    ) -> None:
+        super().__init__(timeout, default_response)
+        # (session id, prompt, reply), answered in order by ``_serve``.
+        self._requests: asyncio.Queue[Tuple[str, str, asyncio.Future[str]]] = (
+            asyncio.Queue()
+        )
+        self._reader: asyncio.Task[None] | None = None
+        self._unclaimed: Dict[str, str] = {}
+
+    async def _serve(self) -> None:
+        while True:
+            session_id, prompt, reply = await self._requests.get()
+            if reply.done():
+                # Timed out before its prompt was shown.
+                continue
+            line = await asyncio.to_thread(input, f"[{session_id}] {prompt}")
+            if reply.done():
+                self._unclaimed[session_id] = line
+            else:
+                reply.set_result(line)
+
+    async def _read(self, session_id: str, prompt: str) -> str:
+        if session_id in self._unclaimed:
+            return self._unclaimed.pop(session_id)
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._serve())
+        reply = asyncio.get_running_loop().create_future()
+        self._requests.put_nowait((session_id, prompt, reply))
+        return await reply
+
+
+class QueueInputChannel(HumanInputChannel):
+    """Replies are pushed in per session, e.g. by a web frontend."""
+
+    def __init__(
+        self, timeout: float | None = None, default_response: str = "APPROVE"
+    ) -> None:
+        super().__init__(timeout, default_response)
+        self._queues: Dict[str, asyncio.Queue[str]] = {}
+
+    def _queue(self, session_id: str) -> asyncio.Queue[str]:
+        return self._queues.setdefault(session_id, asyncio.Queue())
+
+    def submit(self, session_id: str, reply: str) -> None:
+        self._queue(session_id).put_nowait(reply)
+
+    async def _read(self, session_id: str, prompt: str) -> str:
+        return await self._queue(session_id).get()
+
+
+class FileInputChannel(HumanInputChannel):
+    """File-based stand-in for a human operator.
+
+    The prompt is written to ``<directory>/<session_id>.prompt``; the reply is
+    whatever appears in ``<session_id>.reply``, which is polled and removed
+    once read.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        poll_interval: float = 0.5,
+        timeout: float | None = None,
+        default_response: str = "APPROVE",
+    ) -> None:
+        super().__init__(timeout, default_response)
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._poll_interval = poll_interval
+
+    async def _read(self, session_id: str, prompt: str) -> str:
+        prompt_path = self._directory / f"{session_id}.prompt"
+        reply_path = self._directory / f"{session_id}.reply"
+        prompt_path.write_text(prompt, encoding="utf-8")
+        try:
+            while not reply_path.exists():
+                await asyncio.sleep(self._poll_interval)
+            reply = reply_path.read_text(encoding="utf-8").strip()
+            reply_path.unlink()
+            return reply
+        finally:
+            prompt_path.unlink(missing_ok=True)
@@ -0,0 +1,112 @@
+import hashlib
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple
+
+from PIL import Image as PILImage
+
+
+class ImageCache:
+    """Content-addressed on-disk cache for generated images and their thumbnails.
+
+    Entries are keyed by the normalized prompt, model and size, stored as raw
+    image bytes and read back through mmap. The cache is bounded by
+    ``max_bytes``; the least recently used files are evicted first, with file
+    modification times carrying the recency across runs.
+    """
+
+    def __init__(
+        self, cache_dir: str | Path = ".image_cache", max_bytes: int = 512 * 2**20
+    ) -> None:
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # File name -> size, least recently used first.
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        entries = [
+            (path.stat().st_mtime, path.name, path.stat().st_size)
+            for path in self._cache_dir.iterdir()
+            if path.is_file() and not path.name.endswith(".tmp")
+        ]
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def key(prompt: str, model: str, size: str) -> str:
+        normalized = " ".join(prompt.casefold().split())
+        return hashlib.sha256(f"{model}\0{size}\0{normalized}".encode()).hexdigest()
+
+    @staticmethod
+    def _thumbnail_name(key: str, size: Tuple[int, int]) -> str:
+        return f"{key}.{size[0]}x{size[1]}.png"
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+        try:
+            os.utime(self._cache_dir / name)
+        except FileNotFoundError:
+            pass
+
+    def _write(self, name: str, data: bytes) -> None:
+        path = self._cache_dir / name
+        tmp_path = path.with_name(f"{name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            while self._total_bytes > self._max_bytes and len(self._index) > 1:
+                evicted, evicted_size = self._index.popitem(last=False)
+                self._total_bytes -= evicted_size
+                (self._cache_dir / evicted).unlink(missing_ok=True)
+
+    def _open(self, name: str) -> PILImage.Image | None:
+        path = self._cache_dir / name
+        try:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                image = PILImage.open(mapped)  # type: ignore
+                # Decode while the mapping is still open.
+                image.load()
+        except (FileNotFoundError, ValueError):
+            # Evicted by another writer, or an empty file that cannot be mapped.
+            return None
+        self._touch(name)
+        return image
+
+    def put(self, key: str, data: bytes) -> None:
+        self._write(key, data)
+
+    def load(self, key: str) -> PILImage.Image | None:
+        return self._open(key)
+
+    def thumbnail(
+        self, key: str, size: Tuple[int, int] = (256, 256)
+    ) -> PILImage.Image | None:
+        """Return the resized image, creating and caching it on first use."""
+        name = self._thumbnail_name(key, size)
+        thumbnail = self._open(name)
+        if thumbnail is not None:
+            return thumbnail
+        image = self._open(key)
+        if image is None:
+            return None
+        thumbnail = image.resize(size)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format="PNG")
+        self._write(name, buffer.getvalue())
+        return thumbnail
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import signal
+import sys
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock, CodeExecutor, CodeResult
+
+# The kernel reads one JSON request per line and runs it in a namespace that
+# lives as long as the process. Everything the code prints (including output
+# of subprocesses) goes to stdout, followed by a line with the session's
+# sentinel and the exit code.
+KERNEL = r"""
+import json, os, subprocess, sys, traceback
+
+# Requests come in on a private copy of stdin; the code being run gets
+# /dev/null, so input() or a shell command can't read the request stream.
+requests = os.fdopen(os.dup(0), "r")
+devnull = os.open(os.devnull, os.O_RDONLY)
+os.dup2(devnull, 0)
+os.close(devnull)
+sys.stdin = open(os.devnull)
+
+sentinel, memory_limit = sys.argv[1], int(sys.argv[2])
+if memory_limit:
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+namespace = {"__name__": "__main__"}
+while True:
+    try:
+        line = requests.readline()
+    except KeyboardInterrupt:
+        # A late interrupt for a block that had already finished.
+        continue
+    if not line:
+        break
+    request = json.loads(line)
+    exit_code = 0
+    try:
+        if request["language"] == "python":
+            exec(compile(request["code"], "<cell>", "exec"), namespace)
+        else:
+            exit_code = subprocess.run(
+                ["sh", "-c", request["code"]], stdin=subprocess.DEVNULL
+            ).returncode
+    except SystemExit as error:
+        # The same exit codes as the interpreter gives sys.exit arguments.
+        if error.code is None:
+            exit_code = 0
+        elif isinstance(error.code, int):
+            exit_code = error.code
+        else:
+            print(error.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        # Leave this loop's frame out of the traceback.
+        error_type, error, tb = sys.exc_info()
+        traceback.print_exception(error_type, error, tb.tb_next)
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    print(f"\n{sentinel} {exit_code}", flush=True)
+"""
+
+PYTHON_LANGUAGES = {"python", "py", "python3"}
+SHELL_LANGUAGES = {"sh", "bash", "shell"}
+
+
+class PythonKernelCodeExecutor(CodeExecutor):
+    """Run code blocks in one long-lived local Python process.
+
+    Variables, imports and loaded DataFrames stay in the kernel's namespace
+    between calls, so a multi-step analysis imports pandas and reads its data
+    once. Shell blocks run as subprocesses of the kernel in ``work_dir``.
+
+    ``memory_limit_mb`` caps the kernel's address space; code that exceeds it
+    gets a ``MemoryError`` and the kernel survives. A block that runs longer
+    than ``timeout`` seconds, or is cancelled, is interrupted with SIGINT; if
+    the kernel doesn't respond it is killed and the next block starts a fresh
+    one. ``restart`` discards all state.
+    """
+
+    def __init__(
+        self,
+        work_dir: str | Path = "coding",
+        timeout: float = 60.0,
+        memory_limit_mb: int | None = None,
+        interrupt_grace: float = 5.0,
+    ) -> None:
+        self._work_dir = Path(work_dir)
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        self._timeout = timeout
+        self._memory_limit = (memory_limit_mb or 0) * 1024 * 1024
+        self._interrupt_grace = interrupt_grace
+        self._process: asyncio.subprocess.Process | None = None
+        self._sentinel = ""
+        # Kernel output read past the last complete line.
+        self._buffer = bytearray()
+        self._lock = asyncio.Lock()
+
+    @property
+    def work_dir(self) -> Path:
+        return self._work_dir
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._ensure_kernel()
+
+    async def _ensure_kernel(self) -> asyncio.subprocess.Process:
+        if self._process is None or self._process.returncode is not None:
+            self._sentinel = f"__kernel_done_{uuid.uuid4().hex}__"
+            self._buffer = bytearray()
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-u",
+                "-c",
+                KERNEL,
+                self._sentinel,
+                str(self._memory_limit),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self._work_dir,
+            )
+        return self._process
+
+    async def _kill(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        self._process = None
+
+    async def _read_result(
+        self, process: asyncio.subprocess.Process, lines: List[str]
+    ) -> int | None:
+        """Collect output until the sentinel; ``None`` if the kernel exited.
+
+        Output is read in chunks rather than with ``readline``, whose 64 KiB
+        limit a single wide DataFrame row can exceed.
+        """
+        assert process.stdout is not None
+        sentinel = self._sentinel.encode()
+        buffer = self._buffer
+        # Start of the current line, and how far it has been searched.
+        start = scanned = 0
+        while True:
+            end = buffer.find(b"\n", scanned)
+            if end == -1:
+                del buffer[:start]
+                scanned = len(buffer)
+                start = 0
+                chunk = await process.stdout.read(1 << 16)
+                if not chunk:
+                    if buffer:
+                        lines.append(buffer.decode("utf-8", errors="replace"))
+                        buffer.clear()
+                    return None
+                buffer += chunk
+                continue
+            raw = bytes(buffer[start : end + 1])
+            start = scanned = end + 1
+            if raw.startswith(sentinel):
+                del buffer[:start]
+                # Drop the newline printed in front of the sentinel.
+                if lines and lines[-1].endswith("\n"):
+                    lines[-1] = lines[-1][:-1]
+                return int(raw.split()[1])
+            lines.append(raw.decode("utf-8", errors="replace"))
+
+    async def _run(
+        self, code: str, language: str, cancellation_token: CancellationToken
+    ) -> Tuple[str, int]:
+        process = await self._ensure_kernel()
+        assert process.stdin is not None
+        request = {"code": code, "language": language}
+        process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        await process.stdin.drain()
+
+        lines: List[str] = []
+        # The reader is never cancelled, so the stream stays in sync with the
+        # kernel even when the caller gives up on a block.
+        reader = asyncio.ensure_future(self._read_result(process, lines))
+        cancelled: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        cancellation_token.link_future(cancelled)
+        await asyncio.wait(
+            {reader, cancelled},
+            timeout=self._timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not reader.done():
+            process.send_signal(signal.SIGINT)
+            await asyncio.wait({reader}, timeout=self._interrupt_grace)
+            if not reader.done():
+                reader.cancel()
+                await self._kill()
+                lines.append("\nKernel did not respond and was restarted.")
+            if cancelled.done():
+                return "".join(lines) + "\nCode execution was cancelled.", 1
+            return "".join(lines) + "\nTimeout", 124
+        try:
+            exit_code = reader.result()
+        except Exception as error:
+            # The output can't be trusted to line up with the next block.
+            await self._kill()
+            lines.append(f"\nKernel output could not be read ({error!r}); restarted.")
+            return "".join(lines), 1
+        if exit_code is None:
+            await self._kill()
+            lines.append("\nKernel exited; its state was lost.")
+            return "".join(lines), process.returncode or 1
+        return "".join(lines), exit_code
+
+    async def execute_code_blocks(
+        self, code_blocks: List[CodeBlock], cancellation_token: CancellationToken
+    ) -> CodeResult:
+        outputs: List[str] = []
+        exit_code = 0
+        async with self._lock:
+            for code_block in code_blocks:
+                language = code_block.language.lower()
+                if language in PYTHON_LANGUAGES:
+                    language = "python"
+                elif language in SHELL_LANGUAGES:
+                    language = "sh"
+                else:
+                    outputs.append(f"Unsupported language: {code_block.language}")
+                    exit_code = 1
+                    break
+                output, exit_code = await self._run(
+                    code_block.code, language, cancellation_token
+                )
+                outputs.append(output)
+                if exit_code != 0:
+                    break
+        return CodeResult(exit_code=exit_code, output="".join(outputs))
+
+    async def restart(self) -> None:
+        async with self._lock:
+            await self._kill()
+            await self._ensure_kernel()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._process is not None and self._process.returncode is None:
+                assert self._process.stdin is not None
+                self._process.stdin.close()
+                try:
+                    await asyncio.wait_for(self._process.wait(), 5.0)
+                except asyncio.TimeoutError:
+                    pass
+            await self._kill()
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass
+class MessageChunk:
+    """Part of a message that is published while it is still being generated.
+
+    ``index`` orders the chunks of one message; the last chunk has
+    ``done=True`` and no content. ``item_id`` says which message the chunk
+    belongs to when one agent streams several.
+    """
+
+    index: int
+    content: str
+    done: bool = False
+    item_id: str = ""
+
+
+class ChunkAssembler:
+    """Put the chunks of one streamed message back together.
+
+    The runtime may deliver published messages out of order, so ``add`` holds
+    chunks back until every earlier one has arrived and returns the ones that
+    are now in order.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, MessageChunk] = {}
+        self._next_index = 0
+        self._parts: List[str] = []
+        self.done = False
+
+    def add(self, chunk: MessageChunk) -> List[str]:
+        self._pending[chunk.index] = chunk
+        ready: List[str] = []
+        while self._next_index in self._pending:
+            chunk = self._pending.pop(self._next_index)
+            self._next_index += 1
+            if chunk.done:
+                self.done = True
+            else:
+                ready.append(chunk.content)
+        self._parts.extend(ready)
+        return ready
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Mapping, Optional, Sequence
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+
+def _echo(messages: Sequence[LLMMessage]) -> str:
+    content = messages[-1].content
+    return content if isinstance(content, str) else "OK"
+
+
+class MockChatCompletionClient(ChatCompletionClient):
+    """Offline stand-in for a chat completion model, used by the benchmarks.
+
+    ``respond`` maps the request messages to the completion text and every
+    call takes ``latency`` seconds, so runs measure the orchestration around
+    the model rather than the model itself.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[Sequence[LLMMessage]], str] = _echo,
+        latency: float = 0.05,
+        stream_chunks: int = 8,
+    ) -> None:
+        self._respond = respond
+        self._latency = latency
+        self._stream_chunks = stream_chunks
+        self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self.calls = 0
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        await asyncio.sleep(self._latency)
+        return self._complete(messages)
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        # Spread the same latency over the chunks.
+        result = self._complete(messages)
+        assert isinstance(result.content, str)
+        step = max(1, len(result.content) // self._stream_chunks)
+        for start in range(0, len(result.content), step):
+            await asyncio.sleep(self._latency / self._stream_chunks)
+            yield result.content[start : start + step]
+        yield result
+
+    def _complete(self, messages: Sequence[LLMMessage]) -> CreateResult:
+        self.calls += 1
+        content = self._respond(messages)
+        usage = RequestUsage(
+            prompt_tokens=self.count_tokens(messages),
+            completion_tokens=len(content) // 4,
+        )
+        self._usage = RequestUsage(
+            prompt_tokens=self._usage.prompt_tokens + usage.prompt_tokens,
+            completion_tokens=self._usage.completion_tokens + usage.completion_tokens,
+        )
+        return CreateResult(
+            finish_reason="stop", content=content, usage=usage, cached=False
+        )
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._usage
+
+    def count_tokens(
+        self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []
+    ) -> int:
+        return sum(len(str(message.content)) // 4 for message in messages)
+
+    def remaining_tokens(
+        self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []
+    ) -> int:
+        return 128000 - self.count_tokens(messages)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.model_info  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelInfo(
+            vision=False, function_calling=True, json_output=False, family="unknown"
+        )
@@ -0,0 +1,231 @@
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Tuple
+
+import httpx
+import openai
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,  # type: ignore
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+
+class ChatCompletionClientWrapper(ChatCompletionClient):
+    """Delegates everything to an inner client; subclasses override create."""
+
+    def __init__(self, client: ChatCompletionClient) -> None:
+        self._client = client
+
+    @property
+    def inner_client(self) -> ChatCompletionClient:
+        return self._client
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        return await self._client.create(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        return self._client.create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(
+        self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []
+    ) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(
+        self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []
+    ) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._client.capabilities  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
+
+
+class SharedChatCompletionClient(ChatCompletionClientWrapper):
+    """A registry-owned client shared by many agents.
+
+    Requests are limited by a semaphore shared by every client on the same
+    endpoint. ``close`` is a no-op because agents don't own the client; use
+    ``close_model_clients`` at shutdown.
+    """
+
+    def __init__(
+        self, client: ChatCompletionClient, request_slots: asyncio.Semaphore
+    ) -> None:
+        super().__init__(client)
+        self._request_slots = request_slots
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        async with self._request_slots:
+            return await super().create(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+
+    async def create_stream(  # type: ignore
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        async with self._request_slots:
+            async for chunk in super().create_stream(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            ):
+                yield chunk
+
+    async def close(self) -> None:
+        pass
+
+
+# One keep-alive connection pool and request limit per endpoint, and one client
+# per (model, endpoint, options); OpenAI clients likewise per (endpoint, options).
+_http_clients: Dict[str | None, httpx.AsyncClient] = {}
+_request_slots: Dict[str | None, asyncio.Semaphore] = {}
+_model_clients: Dict[Tuple[str, str | None, str], SharedChatCompletionClient] = {}
+_openai_clients: Dict[Tuple[str | None, str], openai.AsyncClient] = {}
+
+
+def _http_client(
+    base_url: str | None,
+    max_connections: int = 64,
+    max_keepalive_connections: int = 32,
+    keepalive_expiry: float = 120.0,
+) -> httpx.AsyncClient:
+    if base_url not in _http_clients:
+        _http_clients[base_url] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+        )
+    return _http_clients[base_url]
+
+
+def get_model_client(
+    model: str,
+    base_url: str | None = None,
+    max_concurrent_requests: int = 32,
+    **kwargs: Any,
+) -> ChatCompletionClient:
+    """Return the shared client for ``model`` on ``base_url``, creating it once.
+
+    Extra keyword arguments are passed to ``OpenAIChatCompletionClient`` and
+    are part of the cache key, so e.g. a different ``response_format`` gets its
+    own client while still using the endpoint's connection pool.
+    ``max_concurrent_requests`` only applies when the endpoint is first seen.
+    """
+    key = (model, base_url, json.dumps(kwargs, sort_keys=True, default=repr))
+    if key not in _model_clients:
+        if base_url is not None:
+            kwargs["base_url"] = base_url
+        client = OpenAIChatCompletionClient(
+            model=model, http_client=_http_client(base_url), **kwargs
+        )
+        request_slots = _request_slots.setdefault(
+            base_url, asyncio.Semaphore(max_concurrent_requests)
+        )
+        _model_clients[key] = SharedChatCompletionClient(client, request_slots)
+    return _model_clients[key]
+
+
+def get_openai_client(
+    base_url: str | None = None, api_key: str | None = None, **kwargs: Any
+) -> openai.AsyncClient:
+    """Return a shared ``openai.AsyncClient`` that reuses the endpoint's pool.
+
+    Like ``get_model_client``, the ``api_key`` and extra keyword arguments
+    (passed to ``openai.AsyncClient``) are part of the cache key, so callers
+    with different credentials or options never share a client.
+    """
+    key = (
+        base_url,
+        json.dumps({"api_key": api_key, **kwargs}, sort_keys=True, default=repr),
+    )
+    if key not in _openai_clients:
+        _openai_clients[key] = openai.AsyncClient(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=_http_client(base_url),
+            **kwargs,
+        )
+    return _openai_clients[key]
+
+
+async def close_model_clients() -> None:
+    for client in _model_clients.values():
+        await client.inner_client.close()
+    for http_client in _http_clients.values():
+        await http_client.aclose()
+    _model_clients.clear()
+    _openai_clients.clear()
+    _http_clients.clear()
+    _request_slots.clear()
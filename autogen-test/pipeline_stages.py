@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+
+class PipelineStage:
+    """Bounded queue and worker pool for one stage of an agent pipeline.
+
+    An item must be admitted before it is published to the stage. A stage
+    holds at most ``workers + queue_size`` items; once full, ``admit`` blocks.
+    An item keeps its slot until it has been admitted to the next stage, so a
+    slow stage fills up the stages before it in turn, all the way back to
+    whoever feeds the pipeline.
+
+    The runtime creates one agent per item, so the worker pool is a semaphore
+    that limits how many of them are in service at the same time.
+    """
+
+    def __init__(self, name: str, workers: int = 4, queue_size: int = 16) -> None:
+        self.name = name
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._workers = asyncio.Semaphore(workers)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_service = 0
+        self.forwarding = 0
+        self.processed = 0
+        self.service_time = 0.0
+
+    @property
+    def mean_service_time(self) -> float:
+        return self.service_time / self.processed if self.processed else 0.0
+
+    @property
+    def seconds_per_item(self) -> float:
+        """Mean service time spread over the workers; the largest is the bottleneck."""
+        return self.mean_service_time / self.workers
+
+    async def admit(self) -> None:
+        """Reserve a place in this stage, waiting while it is full."""
+        await self._slots.acquire()
+
+    @asynccontextmanager
+    async def admitted(self) -> AsyncIterator[None]:
+        """Hold the item's slot until the handler has forwarded it."""
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def worker(self) -> AsyncIterator[None]:
+        """Run the stage's work on one of its workers and time it."""
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await self._workers.acquire()
+        finally:
+            self.queue_depth -= 1
+        self.in_service += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_time += time.perf_counter() - start
+            self.in_service -= 1
+            self.processed += 1
+            self._workers.release()
+
+    async def forward_to(self, next_stage: "PipelineStage") -> None:
+        """Admit the item to the next stage; this is where backpressure is felt."""
+        self.forwarding += 1
+        try:
+            await next_stage.admit()
+        finally:
+            self.forwarding -= 1
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<24} workers={self.workers:<3} "
+            f"queued={self.queue_depth:<4} in_service={self.in_service:<3} "
+            f"blocked={self.forwarding:<4} max_queued={self.max_queue_depth:<4} "
+            f"processed={self.processed:<6} service={self.mean_service_time:.2f}s "
+            f"per_item={self.seconds_per_item:.2f}s"
+        )
+
+
+def bottleneck(stages: List[PipelineStage]) -> PipelineStage:
+    return max(stages, key=lambda stage: stage.seconds_per_item)
+
+
+def report(stages: Dict[str, PipelineStage]) -> str:
+    lines = [str(stage) for stage in stages.values()]
+    if any(stage.processed for stage in stages.values()):
+        lines.append(f"Bottleneck: {bottleneck(list(stages.values())).name}")
+    return "\n".join(lines)
+
+
+async def monitor(stages: Dict[str, PipelineStage], interval: float = 5.0) -> None:
+    """Print queue depths and service times every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        print(report(stages), flush=True)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, List, Literal, TextIO
+
+from rich.console import Console
+from rich.markdown import Markdown
+
+
+@dataclass
+class RenderEvent:
+    source: str
+    content: Any
+    kind: Literal["markdown", "object"] = "markdown"
+    session: str | None = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class RenderSink:
+    """Render agent output in the background instead of inside message handlers.
+
+    ``emit`` only enqueues the event. A background task drains the queue in
+    batches of up to ``batch_size`` events and hands each batch to a worker
+    thread, which renders it with rich and/or appends it to a JSONL file.
+    Set ``rich=False`` with a ``jsonl_path`` for headless runs.
+
+    If the queue is full the event is dropped and counted in ``dropped``
+    rather than blocking the agent.
+    """
+
+    def __init__(
+        self,
+        rich: bool = True,
+        jsonl_path: str | Path | None = None,
+        batch_size: int = 32,
+        max_queue_size: int = 10000,
+    ) -> None:
+        self._console = Console() if rich else None
+        self._jsonl_path = Path(jsonl_path) if jsonl_path is not None else None
+        self._jsonl_file: TextIO | None = None
+        self._batch_size = batch_size
+        self._queue: asyncio.Queue[RenderEvent] = asyncio.Queue(max_queue_size)
+        self._worker: asyncio.Task[None] | None = None
+        self.dropped = 0
+
+    def emit(self, event: RenderEvent) -> None:
+        if self._console is None and self._jsonl_path is None:
+            return
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._render_batch, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _render_batch(self, batch: List[RenderEvent]) -> None:
+        if self._console is not None:
+            for event in batch:
+                if event.kind == "markdown":
+                    self._console.print(Markdown(str(event.content)))
+                else:
+                    self._console.print(event.content)
+        if self._jsonl_path is not None:
+            if self._jsonl_file is None:
+                self._jsonl_file = open(self._jsonl_path, "a", encoding="utf-8")
+            for event in batch:
+                self._jsonl_file.write(json.dumps(asdict(event), default=str) + "\n")
+            self._jsonl_file.flush()
+
+    async def flush(self) -> None:
+        """Wait until every emitted event has been rendered."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+            self._jsonl_file = None
+
+
+_default_sink: RenderSink | None = None
+
+
+def default_render_sink() -> RenderSink:
+    """The process-wide sink used by agents that aren't given one."""
+    global _default_sink
+    if _default_sink is None:
+        _default_sink = RenderSink()
+    return _default_sink
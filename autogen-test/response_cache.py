@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Tuple
+
+from autogen_core import CancellationToken, Image
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+
+from model_clients import ChatCompletionClientWrapper
+
+DEFAULT_CACHE_PATH = ".response_cache.sqlite"
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Image):
+        return value.to_base64()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        # Structured output, e.g. response_format=AgentResponse.
+        return value.model_json_schema()
+    return repr(value)
+
+
+def _create_args(client: ChatCompletionClient) -> Dict[str, Any]:
+    """Model and default request options (e.g. response_format) of a client."""
+    while isinstance(client, ChatCompletionClientWrapper):
+        client = client.inner_client
+    create_args = getattr(client, "_create_args", None)
+    if create_args is None:
+        return {"client": type(client).__name__}
+    return dict(create_args)
+
+
+def cache_key(
+    create_args: Mapping[str, Any],
+    messages: Sequence[LLMMessage],
+    tools: Sequence[Tool | ToolSchema],
+    json_output: Optional[bool],
+    extra_create_args: Mapping[str, Any],
+) -> str:
+    payload = {
+        "create_args": create_args,
+        "messages": [_jsonable(message) for message in messages],
+        "tools": [tool.schema if isinstance(tool, Tool) else tool for tool in tools],
+        "json_output": json_output,
+        "extra_create_args": extra_create_args,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Response cache: {self.hits} hits ({self.memory_hits} memory, "
+            f"{self.disk_hits} disk), {self.misses} misses, {self.expired} expired, "
+            f"hit rate {self.hit_rate:.0%}"
+        )
+
+
+class ResponseCache:
+    """Two-tier store of serialized ``CreateResult``s.
+
+    An in-memory LRU of ``max_entries`` results sits in front of an optional
+    SQLite file at ``path`` that survives restarts. Entries older than ``ttl``
+    seconds are treated as misses and removed; ``ttl=None`` keeps them forever.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = DEFAULT_CACHE_PATH,
+        max_entries: int = 1024,
+        ttl: float | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._memory: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self._db.commit()
+        self.stats = CacheStats()
+
+    def _fresh(self, created: float) -> bool:
+        return self._ttl is None or time.time() - created < self._ttl
+
+    def _remember(self, key: str, created: float, result: str) -> None:
+        self._memory[key] = (created, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+            elif self._db is not None:
+                entry = self._db.execute(
+                    "SELECT created, result FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if entry is not None and self._fresh(entry[0]):
+                    self._remember(key, *entry)
+                    self.stats.disk_hits += 1
+                    return entry[1]
+            if entry is not None:
+                self.stats.expired += 1
+                if self._db is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, result: str) -> None:
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, created, result),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedChatCompletionClient(ChatCompletionClientWrapper):
+    """Memoize ``create`` and ``create_stream`` on the full request.
+
+    The key covers the client's model and default options (including
+    ``response_format``), the messages, tools, ``json_output`` and extra create
+    args. Identical requests that arrive while the first is still running wait
+    for it instead of calling the model again. Hits are returned with
+    ``cached=True``.
+    """
+
+    def __init__(
+        self, client: ChatCompletionClient, cache: ResponseCache | None = None
+    ) -> None:
+        super().__init__(client)
+        self._cache = cache or ResponseCache()
+        self._create_args = _create_args(client)
+        self._in_flight: Dict[str, asyncio.Future[CreateResult | None]] = {}
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    async def _lookup(self, key: str) -> CreateResult | None:
+        cached = await asyncio.to_thread(self._cache.get, key)
+        if cached is None:
+            return None
+        result = CreateResult.model_validate_json(cached)
+        result.cached = True
+        return result
+
+    async def _wait_in_flight(self, key: str) -> CreateResult | None:
+        """Share the result of an identical request that is already running."""
+        future = self._in_flight.get(key)
+        if future is None:
+            return None
+        # None means that request failed or was cancelled; try our own.
+        return await asyncio.shield(future)
+
+    async def _store(self, key: str, result: CreateResult) -> None:
+        await asyncio.to_thread(self._cache.put, key, result.model_dump_json())
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = cache_key(
+            self._create_args, messages, tools, json_output, extra_create_args
+        )
+        result = await self._wait_in_flight(key)
+        if result is not None:
+            return result
+        future: asyncio.Future[CreateResult | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        try:
+            result = await self._lookup(key)
+            if result is None:
+                result = await super().create(
+                    messages,
+                    tools=tools,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                )
+                await self._store(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result(None)
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def create_stream(  # type: ignore
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        key = cache_key(
+            self._create_args, messages, tools, json_output, extra_create_args
+        )
+        cached = await self._wait_in_flight(key) or await self._lookup(key)
+        if cached is not None:
+            # Replay as a single chunk so streaming consumers still see text.
+            if isinstance(cached.content, str):
+                yield cached.content
+            yield cached
+            return
+        async for chunk in super().create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                await self._store(key, chunk)
+            yield chunk
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def cached_client(
+    client: ChatCompletionClient,
+    path: str | Path | None = DEFAULT_CACHE_PATH,
+    **kwargs: Any,
+) -> ChatCompletionClient:
+    """Wrap ``client`` with the process-wide cache stored at ``path``.
+
+    Extra keyword arguments (``max_entries``, ``ttl``) apply when the cache for
+    ``path`` is first created. Set ``AUTOGEN_RESPONSE_CACHE=0`` to bypass the
+    cache, e.g. when sampling variety is wanted.
+    """
+    if os.environ.get("AUTOGEN_RESPONSE_CACHE", "1") == "0":
+        return client
+    cache_path = str(path)
+    if cache_path not in _caches:
+        _caches[cache_path] = ResponseCache(path, **kwargs)
+    return CachedChatCompletionClient(client, _caches[cache_path])
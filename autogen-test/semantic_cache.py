@@ -0,0 +1,310 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncGenerator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    SystemMessage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+from chat_context import message_text
+from model_clients import ChatCompletionClientWrapper
+from response_cache import _create_args, cache_key
+
+
+class HashedNgramEmbedder:
+    """Embed text as hashed word and character n-gram counts.
+
+    Needs no model and is stable across processes, so stored vectors stay
+    valid. Texts that differ in a few words or in punctuation and casing end up
+    with a cosine similarity close to 1.
+    """
+
+    def __init__(self, dim: int = 1024, char_ngram: int = 4) -> None:
+        self.dim = dim
+        self._char_ngram = char_ngram
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.casefold())
+        features = words + [" ".join(pair) for pair in zip(words, words[1:])]
+        joined = " ".join(words)
+        n = self._char_ngram
+        features += [joined[i : i + n] for i in range(len(joined) - n + 1)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            # The top bit picks the sign so collisions cancel out on average.
+            vector[value % self.dim] += 1.0 if value >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@dataclass
+class SemanticCacheStats:
+    hits: int = 0
+    misses: int = 0
+    similarity_total: float = 0.0
+
+    @property
+    def mean_hit_similarity(self) -> float:
+        return self.similarity_total / self.hits if self.hits else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Semantic cache: {self.hits} hits, {self.misses} misses, "
+            f"mean hit similarity {self.mean_hit_similarity:.3f}"
+        )
+
+
+class SemanticCache:
+    """Approximate nearest-neighbour index of prompts and their completions.
+
+    Vectors and their LSH signatures (one bit per random hyperplane) live in
+    memory-mapped arrays under ``directory``, so a restart just maps them
+    again. A lookup scans the signature array for the query's bucket and the
+    buckets one bit away, then ranks only those candidates by cosine
+    similarity. Only entries with the same scope (model options, system
+    prompt, tools) are candidates. Completions are kept in SQLite; a row's id
+    is its position in the arrays.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = ".semantic_cache",
+        embedder: HashedNgramEmbedder | None = None,
+        num_planes: int = 16,
+        initial_capacity: int = 1024,
+    ) -> None:
+        self._embedder = embedder or HashedNgramEmbedder()
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        dim = self._embedder.dim
+        # Fixed seed: the planes must be the same in every process.
+        self._planes = (
+            np.random.default_rng(0)
+            .standard_normal((num_planes, dim))
+            .astype(np.float32)
+        )
+        self._bit_weights = (1 << np.arange(num_planes)).astype(np.uint32)
+        self._db = sqlite3.connect(
+            self._directory / "entries.sqlite", check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, "
+            "scope TEXT NOT NULL, created REAL NOT NULL, result TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)"
+        )
+        layout = json.dumps({"dim": dim, "num_planes": num_planes})
+        stored = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'layout'"
+        ).fetchone()
+        if stored is None:
+            self._db.execute("INSERT INTO meta VALUES ('layout', ?)", (layout,))
+        elif stored[0] != layout:
+            raise ValueError(
+                f"{self._directory} was built with {stored[0]}, not {layout}."
+            )
+        self._db.commit()
+        (last_id,) = self._db.execute("SELECT MAX(id) FROM entries").fetchone()
+        self._count = 0 if last_id is None else last_id + 1
+        self._capacity = 0
+        self._map(max(initial_capacity, self._count))
+
+    def _map(self, capacity: int) -> None:
+        """(Re)map the arrays, growing the files to ``capacity`` rows."""
+        dim = self._embedder.dim
+        arrays = {
+            "vectors.f32": (np.float32, (capacity, dim)),
+            "signatures.u32": (np.uint32, (capacity,)),
+            "scopes.u64": (np.uint64, (capacity,)),
+        }
+        mapped = []
+        for name, (dtype, shape) in arrays.items():
+            path = self._directory / name
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, "ab") as file:
+                if file.tell() < size:
+                    file.truncate(size)
+            mapped.append(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+        self._vectors, self._signatures, self._scopes = mapped
+        self._capacity = capacity
+
+    def _signature(self, vector: np.ndarray) -> np.uint32:
+        bits = (self._planes @ vector) > 0
+        return np.uint32(bits @ self._bit_weights)
+
+    def _probes(self, signature: np.uint32) -> np.ndarray:
+        flips = signature ^ self._bit_weights
+        return np.append(flips, signature)
+
+    @staticmethod
+    def _scope_id(scope: str) -> np.uint64:
+        return np.uint64(int(scope[:16], 16))
+
+    def lookup(self, scope: str, text: str) -> Tuple[str, float] | None:
+        """Best cached completion for ``text`` within ``scope`` and its similarity."""
+        query = self._embedder.embed(text)
+        with self._lock:
+            count = self._count
+            candidates = np.flatnonzero(
+                (self._scopes[:count] == self._scope_id(scope))
+                & np.isin(
+                    self._signatures[:count], self._probes(self._signature(query))
+                )
+            )
+            if not len(candidates):
+                return None
+            similarities = self._vectors[candidates] @ query
+            best = int(np.argmax(similarities))
+            (result,) = self._db.execute(
+                "SELECT result FROM entries WHERE id = ?", (int(candidates[best]),)
+            ).fetchone()
+        return result, float(similarities[best])
+
+    def add(self, scope: str, text: str, result: str) -> None:
+        vector = self._embedder.embed(text)
+        with self._lock:
+            if self._count == self._capacity:
+                self._map(self._capacity * 2)
+            entry_id = self._count
+            self._vectors[entry_id] = vector
+            self._signatures[entry_id] = self._signature(vector)
+            self._scopes[entry_id] = self._scope_id(scope)
+            for array in (self._vectors, self._signatures, self._scopes):
+                array.flush()
+            self._db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                (entry_id, scope, time.time(), result),
+            )
+            self._db.commit()
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def _split_prompt(messages: Sequence[LLMMessage]) -> Tuple[List[LLMMessage], str]:
+    """System messages must match exactly; the rest is compared semantically."""
+    system = [message for message in messages if isinstance(message, SystemMessage)]
+    text = "\n".join(
+        message_text(message)
+        for message in messages
+        if not isinstance(message, SystemMessage)
+    )
+    return system, text
+
+
+class SemanticCachedChatCompletionClient(ChatCompletionClientWrapper):
+    """Answer prompts that are close enough to an earlier one from the cache.
+
+    Opt-in and lossy by design: a request is a hit when its non-system text
+    has cosine similarity of at least ``threshold`` with a cached prompt
+    that had the same model options, system messages and tools.
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        cache: SemanticCache | None = None,
+        threshold: float = 0.95,
+    ) -> None:
+        super().__init__(client)
+        self._cache = cache if cache is not None else SemanticCache()
+        self._threshold = threshold
+        self._create_args = _create_args(client)
+        self.stats = SemanticCacheStats()
+
+    def _scope(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool],
+        extra_create_args: Mapping[str, Any],
+    ) -> Tuple[str, str]:
+        system, text = _split_prompt(messages)
+        scope = cache_key(
+            self._create_args, system, tools, json_output, extra_create_args
+        )
+        return scope, text
+
+    async def _lookup(self, scope: str, text: str) -> CreateResult | None:
+        match = await asyncio.to_thread(self._cache.lookup, scope, text)
+        if match is None or match[1] < self._threshold:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self.stats.similarity_total += match[1]
+        result = CreateResult.model_validate_json(match[0])
+        result.cached = True
+        return result
+
+    async def _store(self, scope: str, text: str, result: CreateResult) -> None:
+        await asyncio.to_thread(self._cache.add, scope, text, result.model_dump_json())
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        scope, text = self._scope(messages, tools, json_output, extra_create_args)
+        result = await self._lookup(scope, text)
+        if result is None:
+            result = await super().create(
+                messages,
+                tools=tools,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+            await self._store(scope, text, result)
+        return result
+
+    async def create_stream(  # type: ignore
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        json_output: Optional[bool] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[str | CreateResult, None]:
+        scope, text = self._scope(messages, tools, json_output, extra_create_args)
+        cached = await self._lookup(scope, text)
+        if cached is not None:
+            if isinstance(cached.content, str):
+                yield cached.content
+            yield cached
+            return
+        async for chunk in super().create_stream(
+            messages,
+            tools=tools,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                await self._store(scope, text, chunk)
+            yield chunk
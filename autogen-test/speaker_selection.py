@@ -0,0 +1,169 @@
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Pattern, Sequence, Tuple
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, UserMessage
+
+from group_chat_transcript import GroupChatTranscript
+
+
+@dataclass
+class SelectorStats:
+    rule_selections: int = 0
+    cache_hits: int = 0
+    llm_calls: int = 0
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        return self.rule_selections + self.cache_hits
+
+    def __str__(self) -> str:
+        return (
+            f"Speaker selection: {self.llm_calls} LLM calls, "
+            f"{self.llm_calls_avoided} avoided "
+            f"({self.rule_selections} by rules, {self.cache_hits} from cache)"
+        )
+
+
+class SelectionStrategy(ABC):
+    """A deterministic way of picking the next speaker.
+
+    Returns ``None`` when the strategy cannot decide, in which case the next
+    strategy (and eventually the model) is consulted.
+    """
+
+    @abstractmethod
+    def select(
+        self, last_message: UserMessage, candidates: List[str]
+    ) -> str | None: ...
+
+
+class TransitionGraphStrategy(SelectionStrategy):
+    """Follow a fixed speaker graph, e.g. ``{"Writer": ["Editor"], "Editor": ["User"]}``.
+
+    A speaker with a single allowed successor decides the next speaker; a
+    speaker with several successors is ambiguous.
+    """
+
+    def __init__(self, transitions: Dict[str, List[str]]) -> None:
+        self._transitions = transitions
+
+    def select(self, last_message: UserMessage, candidates: List[str]) -> str | None:
+        successors = [
+            topic_type
+            for topic_type in self._transitions.get(last_message.source, [])
+            if topic_type in candidates
+        ]
+        if len(successors) == 1:
+            return successors[0]
+        return None
+
+
+class KeywordRuleStrategy(SelectionStrategy):
+    """Pick the next speaker from keyword or regex matches on the last message.
+
+    Each rule is ``(pattern, topic_type)`` or ``(pattern, topic_type, sources)``,
+    where ``sources`` restricts the rule to messages from those speakers.
+    Plain strings are matched as case-insensitive keywords.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[
+            Tuple[str | Pattern[str], str] | Tuple[str | Pattern[str], str, List[str]]
+        ],
+    ) -> None:
+        self._rules: List[Tuple[Pattern[str], str, List[str] | None]] = []
+        for rule in rules:
+            pattern, topic_type = rule[0], rule[1]
+            sources = rule[2] if len(rule) > 2 else None  # type: ignore
+            if isinstance(pattern, str):
+                pattern = re.compile(rf"\b{re.escape(pattern)}\b", re.IGNORECASE)
+            self._rules.append((pattern, topic_type, sources))
+
+    def select(self, last_message: UserMessage, candidates: List[str]) -> str | None:
+        if not isinstance(last_message.content, str):
+            return None
+        matches = {
+            topic_type
+            for pattern, topic_type, sources in self._rules
+            if topic_type in candidates
+            and (sources is None or last_message.source in sources)
+            and pattern.search(last_message.content)
+        }
+        # Conflicting rules are ambiguous; let the model decide.
+        if len(matches) == 1:
+            return matches.pop()
+        return None
+
+
+class SpeakerSelector:
+    """Choose the next speaker, calling the model only when the rules can't.
+
+    Strategies are tried in order. If none of them decides, the selection is
+    looked up in an LRU cache keyed on a fingerprint of the most recent
+    transcript lines before falling back to a selector completion.
+    """
+
+    def __init__(
+        self,
+        strategies: Sequence[SelectionStrategy] = (),
+        cache_size: int = 256,
+        fingerprint_window: int = 4,
+    ) -> None:
+        self._strategies = list(strategies)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_size = cache_size
+        self._fingerprint_window = fingerprint_window
+        self.stats = SelectorStats()
+
+    def _fingerprint(
+        self, transcript: GroupChatTranscript, previous: str | None
+    ) -> str:
+        digest = hashlib.sha256(str(previous).encode())
+        for line in transcript.lines[-self._fingerprint_window :]:
+            digest.update(b"\0")
+            digest.update(line.encode())
+        return digest.hexdigest()
+
+    async def select(
+        self,
+        transcript: GroupChatTranscript,
+        previous: str | None,
+        last_message: UserMessage,
+        model_client: ChatCompletionClient,
+        cancellation_token: CancellationToken | None = None,
+    ) -> str:
+        candidates = transcript.participants(previous)
+        for strategy in self._strategies:
+            selected = strategy.select(last_message, candidates)
+            if selected is not None and selected in candidates:
+                self.stats.rule_selections += 1
+                return selected
+
+        key = self._fingerprint(transcript, previous)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return self._cache[key]
+
+        system_message = UserMessage(
+            content=transcript.render_selector_prompt(previous),
+            source="selector",
+        )
+        self.stats.llm_calls += 1
+        completion = await model_client.create(
+            [system_message], cancellation_token=cancellation_token
+        )
+        assert isinstance(completion.content, str)
+        for topic_type in transcript.participants(None):
+            if topic_type.lower() in completion.content.lower():
+                self._cache[key] = topic_type
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+                return topic_type
+        raise ValueError(f"Invalid role selected: {completion.content}")
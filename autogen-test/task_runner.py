@@ -0,0 +1,87 @@
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Literal
+
+from autogen_agentchat.base import TaskResult
+from autogen_core import CancellationToken
+
+
+@dataclass
+class TaskRun:
+    task: str
+    status: Literal["completed", "timeout", "failed"]
+    duration: float
+    stop_reason: str | None = None
+    messages: int = 0
+    error: str | None = None
+
+
+class TaskRunner:
+    """Run many independent agent tasks concurrently.
+
+    ``run_task(task, cancellation_token)`` runs one task end to end, e.g. by
+    building its own team and calling ``team.run``. At most
+    ``max_concurrency`` tasks run at once. A task that exceeds
+    ``task_timeout`` has its cancellation token cancelled, which stops its
+    model calls and code execution, and is recorded as a timeout. Failures
+    are recorded rather than raised, so one bad task doesn't stop the run.
+    """
+
+    def __init__(
+        self,
+        run_task: Callable[[str, CancellationToken], Awaitable[TaskResult]],
+        max_concurrency: int = 4,
+        task_timeout: float | None = None,
+    ) -> None:
+        self._run_task = run_task
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._task_timeout = task_timeout
+        self.elapsed = 0.0
+
+    async def run(self, task: str) -> TaskRun:
+        async with self._slots:
+            cancellation_token = CancellationToken()
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    self._run_task(task, cancellation_token), self._task_timeout
+                )
+            except asyncio.TimeoutError:
+                cancellation_token.cancel()
+                return TaskRun(task, "timeout", time.perf_counter() - start)
+            except Exception as error:
+                cancellation_token.cancel()
+                return TaskRun(
+                    task, "failed", time.perf_counter() - start, error=repr(error)
+                )
+            return TaskRun(
+                task,
+                "completed",
+                time.perf_counter() - start,
+                stop_reason=result.stop_reason,
+                messages=len(result.messages),
+            )
+
+    async def run_all(self, tasks: Iterable[str]) -> List[TaskRun]:
+        start = time.perf_counter()
+        runs = await asyncio.gather(*(self.run(task) for task in tasks))
+        self.elapsed = time.perf_counter() - start
+        return list(runs)
+
+    def report(self, runs: List[TaskRun]) -> str:
+        lines = [
+            f"{run.status:<9} {run.duration:7.1f}s {run.messages:3} messages  "
+            f"{run.task[:60]!r} {run.stop_reason or run.error or ''}"
+            for run in runs
+        ]
+        statuses = Counter(run.status for run in runs)
+        longest = max((run.duration for run in runs), default=0.0)
+        lines.append(
+            f"{len(runs)} tasks in {self.elapsed:.1f}s with concurrency "
+            f"{self._max_concurrency} (longest task {longest:.1f}s): "
+            + ", ".join(f"{count} {status}" for status, count in statuses.items())
+        )
+        return "\n".join(lines)
@@ -25,6 +25,9 @@ from typing import Literal
 from pydantic import BaseModel
 import os
 
+from dataset_cache import default_dataset_cache
+from response_cache import CachedChatCompletionClient, cached_client
+
 
 # The response format for the agent as a Pydantic base model.
 class AgentResponse(BaseModel):
@@ -43,17 +46,20 @@ async def web_search(query: str) -> str:
     return "AutoGen is a programming framework for building multi-agent applications."
 
 
-model_client = OpenAIChatCompletionClient(
-    model="qwq:latest",
-    base_url="http://127.0.0.1:11434/v1",
-    api_key="NULL",
-    # parallel_tool_calls=False,
-    model_info={
-        "vision": False,
-        "function_calling": True,
-        "json_output": False,
-        "family": "unknown",
-    },
+# Identical requests are answered from the response cache on re-runs.
+model_client = cached_client(
+    OpenAIChatCompletionClient(
+        model="qwq:latest",
+        base_url="http://127.0.0.1:11434/v1",
+        api_key="NULL",
+        # parallel_tool_calls=False,
+        model_info={
+            "vision": False,
+            "function_calling": True,
+            "json_output": False,
+            "family": "unknown",
+        },
+    )
 )
 
 model_client_vision = OpenAIChatCompletionClient(
@@ -84,9 +90,11 @@ model_client_formated_response = OpenAIChatCompletionClient(
 )
 
 
-model_client_gemini = OpenAIChatCompletionClient(
-    model="gemini-2.0-flash",
-    api_key=os.environ.get("GEMINI_API_KEY"),
+model_client_gemini = cached_client(
+    OpenAIChatCompletionClient(
+        model="gemini-2.0-flash",
+        api_key=os.environ.get("GEMINI_API_KEY"),
+    )
 )
 
 
@@ -129,9 +137,8 @@ async def streaming_run() -> None:
 
 
 async def langchain_test() -> None:
-    df = pd.read_csv(
-        "https://raw.githubusercontent.com/pandas-dev/pandas/main/doc/data/titanic.csv"
-    )
+    # Fetched once, then memory-mapped from the local Arrow copy.
+    df = default_dataset_cache().load("titanic")
     tool = LangChainToolAdapter(PythonAstREPLTool(locals={"df": df}))
     # model_client = OpenAIChatCompletionClient(model="gpt-4o")
     agent = AssistantAgent(
@@ -265,6 +272,8 @@ async def main() -> None:
         [UserMessage(content="What is the capital of France?", source="user")]
     )
     print(await response)
+    if isinstance(model_client, CachedChatCompletionClient):
+        print(model_client.stats)
 
     # text_message = TextMessage(content="Hello, world!", source="User")
     # print(text_message)
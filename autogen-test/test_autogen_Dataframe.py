@@ -1,17 +1,22 @@
 import asyncio
 from autogen_agentchat.agents import AssistantAgent, CodeExecutorAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core import CancellationToken
+from autogen_core.code_executor import CodeBlock
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_agentchat.conditions import TextMentionTermination
 
+from dataset_cache import DatasetCache, default_dataset_cache
+from kernel_executor import PythonKernelCodeExecutor
+from model_clients import close_model_clients, get_model_client
 
-async def setup_code_generation_and_execution():
-    # 1. Set up the model client
-    model_client = OpenAIChatCompletionClient(
+
+async def setup_code_generation_and_execution(
+    code_executor: PythonKernelCodeExecutor,
+):
+    # 1. Set up the model client (shared across tasks, see model_clients.py)
+    model_client = get_model_client(
         model="qwen2.5-coder:32b",  # Replace with your model
         base_url="http://127.0.0.1:11434/v1",  # Replace with your endpoint
         api_key="NULL",
@@ -36,6 +41,7 @@ async def setup_code_generation_and_execution():
     6. Always wrap your code in ```python code blocks
     7. For numerical analysis, handle potential NaN values and invalid data types
     8. When calculating statistics, include relevant context (count, min, max along with average)
+    9. Code runs in a persistent Python session: imports, variables and DataFrames from earlier code blocks are still defined, so reuse them instead of importing or loading the data again
     
     Example output format:
     ```python
@@ -59,18 +65,14 @@ async def setup_code_generation_and_execution():
     ```""",
     )
 
-    # 3. Set up the code executor with Docker
-    code_executor = DockerCommandLineCodeExecutor(work_dir="coding")
-    await code_executor.start()
-
-    # 4. Create the code executor agent
+    # 3. Create the code executor agent (the executor keeps state between blocks)
     code_runner = CodeExecutorAgent(
         name="code_runner",
         code_executor=code_executor,
         sources=["code_generator"],  # Only execute code from the code generator
     )
 
-    # 5. Create a group chat for the agents to collaborate
+    # 4. Create a group chat for the agents to collaborate
     termination = TextMentionTermination("TERMINATE")
     team = RoundRobinGroupChat(
         participants=[code_generator, code_runner],
@@ -78,22 +80,18 @@ async def setup_code_generation_and_execution():
         termination_condition=termination,
     )
 
-    return team, code_executor
+    return team
 
 
-async def run_code_generation_and_execution(task: str):
+async def run_code_generation_and_execution(
+    task: str, code_executor: PythonKernelCodeExecutor
+):
     # Set up the agents
-    team, code_executor = await setup_code_generation_and_execution()
+    team = await setup_code_generation_and_execution(code_executor)
 
-    try:
-        # Run the team chat with the given task
-        print(f"Starting task: {task}")
-        await Console(
-            team.run_stream(task=task, cancellation_token=CancellationToken())
-        )
-    finally:
-        # Clean up: Stop the code executor
-        await code_executor.stop()
+    # Run the team chat with the given task
+    print(f"Starting task: {task}")
+    await Console(team.run_stream(task=task, cancellation_token=CancellationToken()))
 
 
 # Example usage
@@ -105,9 +103,26 @@ async def main():
     3. Show the minimum and maximum ages
     4. Handle missing values appropriately
     
-    The dataset is available at: https://raw.githubusercontent.com/pandas-dev/pandas/main/doc/data/titanic.csv"""
+    The dataset is already loaded as the pandas DataFrame `df` (from the local file 'titanic.arrow'); do not download it."""
 
-    await run_code_generation_and_execution(task)
+    # One kernel per session; the dataset is loaded once and stays in memory
+    code_executor = PythonKernelCodeExecutor(work_dir="coding", memory_limit_mb=4096)
+    await code_executor.start()
+    try:
+        # Link the cached Arrow file into the working directory and map it
+        # into the kernel before the agents start, instead of every task
+        # downloading and parsing the CSV.
+        default_dataset_cache().materialize("titanic", code_executor.work_dir)
+        preload = await code_executor.execute_code_blocks(
+            [CodeBlock(code=DatasetCache.load_snippet("titanic"), language="python")],
+            CancellationToken(),
+        )
+        if preload.exit_code != 0:
+            raise RuntimeError(f"Failed to preload the dataset: {preload.output}")
+        await run_code_generation_and_execution(task, code_executor)
+    finally:
+        await code_executor.stop()
+    await close_model_clients()
 
 
 if __name__ == "__main__":
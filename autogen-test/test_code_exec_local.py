@@ -2,10 +2,11 @@ import asyncio
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_ext.code_executors.local import LocalCommandLineCodeExecutor
 from autogen_ext.tools.code_execution import PythonCodeExecutionTool
 import os
 
+from kernel_executor import PythonKernelCodeExecutor
+
 model_client_gemini = OpenAIChatCompletionClient(
     model="gemini-2.0-flash",
     api_key=os.environ.get("GEMINI_API_KEY"),
@@ -19,7 +20,9 @@ model_client_gemini = OpenAIChatCompletionClient(
 
 
 async def main() -> None:
-    tool = PythonCodeExecutionTool(LocalCommandLineCodeExecutor(work_dir="coding"))
+    # Imports and data from earlier tool calls stay loaded in the kernel
+    code_executor = PythonKernelCodeExecutor(work_dir="coding")
+    tool = PythonCodeExecutionTool(code_executor)
     agent = AssistantAgent(
         "assistant",
         model_client_gemini,
@@ -31,6 +34,7 @@ async def main() -> None:
             task="Create a plot of MSFT stock prices in 2024 and save it to a file. Use yfinance and matplotlib. Generate and run code to solve the task."
         )
     )
+    await code_executor.stop()
 
 
 asyncio.run(main())
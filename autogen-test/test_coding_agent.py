@@ -1,18 +1,27 @@
+import argparse
 import asyncio
 from autogen_agentchat.agents import AssistantAgent, CodeExecutorAgent
 from autogen_agentchat.messages import TextMessage
 from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_core import CancellationToken
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_agentchat.conditions import TextMentionTermination
+from autogen_agentchat.base import TaskResult
 import os
 
+from execution_cache import caching_executor, execution_cache
+from executor_pool import DockerExecutorPool
+from model_clients import close_model_clients, get_model_client
+from response_cache import cached_client
+from task_runner import TaskRunner
 
-async def setup_code_generation_and_execution():
-    # 1. Set up the model client
-    model_client = OpenAIChatCompletionClient(
+
+async def setup_code_generation_and_execution(
+    code_executor: DockerCommandLineCodeExecutor,
+):
+    # 1. Set up the model client (shared across tasks, see model_clients.py)
+    model_client = get_model_client(
         model="qwq:latest",  # Replace with your model
         base_url="http://127.0.0.1:11434/v1",  # Replace with your endpoint
         api_key="NULL",
@@ -24,15 +33,19 @@ async def setup_code_generation_and_execution():
         },
     )
 
-    model_client_gemini = OpenAIChatCompletionClient(
-        model="gemini-2.0-flash",
-        api_key=os.environ.get("GEMINI_API_KEY"),
-        model_info={
-            "vision": True,
-            "function_calling": True,
-            "json_output": True,
-            "family": "gemini-2.0-flash",
-        },
+    # Re-running the same tasks replays cached responses instead of calling
+    # the model again.
+    model_client_gemini = cached_client(
+        get_model_client(
+            model="gemini-2.0-flash",
+            api_key=os.environ.get("GEMINI_API_KEY"),
+            model_info={
+                "vision": True,
+                "function_calling": True,
+                "json_output": True,
+                "family": "gemini-2.0-flash",
+            },
+        )
     )
 
     # 2. Create the code generator agent (AssistantAgent)
@@ -42,18 +55,16 @@ async def setup_code_generation_and_execution():
         system_message="You are a Python programmer. When asked to solve a problem, think step by step and always provide your solution as a Python script within ```python code blocks.",
     )
 
-    # 3. Set up the code executor with Docker
-    code_executor = DockerCommandLineCodeExecutor(work_dir="coding")
-    await code_executor.start()
-
-    # 4. Create the code executor agent
+    # 3. Create the code executor agent (the executor is leased from the pool).
+    # Code the generator re-emits on a later turn or for a repeated task is
+    # answered from the execution cache instead of running again.
     code_runner = CodeExecutorAgent(
         name="code_runner",
-        code_executor=code_executor,
+        code_executor=caching_executor(code_executor),
         sources=["code_generator"],  # Only execute code from the code generator
     )
 
-    # 5. Create a group chat for the agents to collaborate
+    # 4. Create a group chat for the agents to collaborate
     termination = TextMentionTermination("TERMINATE")  # Terminate the conversation
     team = RoundRobinGroupChat(
         participants=[code_generator, code_runner],
@@ -61,26 +72,39 @@ async def setup_code_generation_and_execution():
         termination_condition=termination,  # Limit the conversation rounds
     )
 
-    return team, code_executor
+    return team
 
 
-async def run_code_generation_and_execution(task: str):
-    # Set up the agents
-    team, code_executor = await setup_code_generation_and_execution()
+async def run_code_generation_and_execution(
+    task: str,
+    pool: DockerExecutorPool,
+    cancellation_token: CancellationToken | None = None,
+    verbose: bool = True,
+) -> TaskResult:
+    # The container goes back to the pool (and is reset) when the lease ends,
+    # so every task gets its own team and a clean working directory.
+    async with pool.lease() as code_executor:
+        # Set up the agents
+        team = await setup_code_generation_and_execution(code_executor)
 
-    try:
         # Run the team chat with the given task
+        cancellation_token = cancellation_token or CancellationToken()
+        if not verbose:
+            return await team.run(task=task, cancellation_token=cancellation_token)
         print(f"Starting task: {task}")
-        await Console(
-            team.run_stream(task=task, cancellation_token=CancellationToken())
+        result = await Console(
+            team.run_stream(task=task, cancellation_token=cancellation_token)
         )
-    finally:
-        # Clean up: Stop the code executor
-        await code_executor.stop()
+        assert isinstance(result, TaskResult)
+        return result
 
 
 # Example usage
-async def main():
+async def main(
+    tasks_file: str | None = None,
+    concurrency: int = 4,
+    task_timeout: float | None = 300.0,
+):
     # Example task that requires generating and executing code
     # task = "Write a Python script that creates a list of first 5 Fibonacci numbers and prints them"
     tasks = [
@@ -89,9 +113,40 @@ async def main():
         "Generate a simple plot using matplotlib",
         "Write a Python script that creates a list of first 5 Fibonacci numbers and prints them",
     ]
-    for task in tasks:
-        await run_code_generation_and_execution(task)
+    if tasks_file is not None:
+        with open(tasks_file, encoding="utf-8") as f:
+            tasks = [line.strip() for line in f if line.strip()]
+
+    # One warm container per concurrent task.
+    pool = DockerExecutorPool(
+        work_root="coding", min_size=concurrency, max_size=concurrency
+    )
+    await pool.start()
+    runner = TaskRunner(
+        lambda task, cancellation_token: run_code_generation_and_execution(
+            task,
+            pool,
+            cancellation_token,
+            # Interleaved console output is unreadable; report at the end.
+            verbose=concurrency == 1,
+        ),
+        max_concurrency=concurrency,
+        task_timeout=task_timeout,
+    )
+    try:
+        runs = await runner.run_all(tasks)
+    finally:
+        await pool.close()
+    print(runner.report(runs))
+    print(pool.stats)
+    print(execution_cache().stats)
+    await close_model_clients()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Generate and run code for tasks.")
+    parser.add_argument("--tasks-file", help="Text file with one task per line.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--task-timeout", type=float, default=300.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks_file, args.concurrency, args.task_timeout))
@@ -1,7 +1,8 @@
+import base64
 import json
+import re
 import string
-import uuid
-from typing import List
+from typing import Any, Callable, List, Literal
 import os
 import asyncio
 
@@ -13,34 +14,79 @@ from autogen_core import (
     MessageContext,
     RoutedAgent,
     SingleThreadedAgentRuntime,
-    TopicId,
     TypeSubscription,
     message_handler,
 )
 from autogen_core.models import (
     AssistantMessage,
     ChatCompletionClient,
-    LLMMessage,
     SystemMessage,
     UserMessage,
 )
 from autogen_core.tools import FunctionTool
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 from IPython.display import display  # type: ignore
 from pydantic import BaseModel
-from rich.console import Console
-from rich.markdown import Markdown
+
+from chat_context import ChatContext, ContextPolicy
+from group_chat_sessions import GroupChatSessionManager
+from group_chat_transcript import GroupChatTranscript
+from human_input import (
+    AutoApproveInputChannel,
+    ConsoleInputChannel,
+    HumanInputChannel,
+)
+from image_cache import ImageCache
+from model_clients import close_model_clients, get_model_client, get_openai_client
+from render_sink import RenderEvent, RenderSink, default_render_sink
+from speaker_selection import (
+    KeywordRuleStrategy,
+    SpeakerSelector,
+    TransitionGraphStrategy,
+)
 
 
 class GroupChatMessage(BaseModel):
     body: UserMessage
+    session_id: str = ""
 
 
 class RequestToSpeak(BaseModel):
-    pass
+    session_id: str = ""
+
+
+class SessionAgent(RoutedAgent):
+    """An agent that serves one session at a time on a reused session slot.
+
+    Messages of sessions the session manager no longer runs are dropped, and
+    the first message of a new session resets the agent's state.
+    """
+
+    def __init__(
+        self, description: str, sessions: GroupChatSessionManager | None = None
+    ) -> None:
+        super().__init__(description=description)
+        self._sessions = sessions
+        self._session_id = ""
+
+    def _accept(self, session_id: str) -> bool:
+        if self._sessions is not None and not self._sessions.is_active(session_id):
+            return False
+        if session_id != self._session_id:
+            self._session_id = session_id
+            self._reset()
+        return True
+
+    def _is_current(self, session_id: str) -> bool:
+        """Whether the session is still running here, checked after an await."""
+        return session_id == self._session_id and (
+            self._sessions is None or self._sessions.is_active(session_id)
+        )
+
+    def _reset(self) -> None:
+        pass
 
 
-class BaseGroupChatAgent(RoutedAgent):
+class BaseGroupChatAgent(SessionAgent):
     """A group chat participant using an LLM."""
 
     def __init__(
@@ -49,17 +95,40 @@ class BaseGroupChatAgent(RoutedAgent):
         group_chat_topic_type: str,
         model_client: ChatCompletionClient,
         system_message: str,
+        context_policy: ContextPolicy | None = None,
+        render_sink: RenderSink | None = None,
+        sessions: GroupChatSessionManager | None = None,
     ) -> None:
-        super().__init__(description=description)
+        super().__init__(description=description, sessions=sessions)
         self._group_chat_topic_type = group_chat_topic_type
         self._model_client = model_client
         self._system_message = SystemMessage(content=system_message)
-        self._chat_history: List[LLMMessage] = []
+        self._context_policy = context_policy
+        self._chat_history = ChatContext(context_policy)
+        self._render_sink = render_sink or default_render_sink()
+
+    def _reset(self) -> None:
+        self._chat_history = ChatContext(self._context_policy)
+
+    def _render(
+        self, content: Any, kind: Literal["markdown", "object"] = "markdown"
+    ) -> None:
+        # Rendering happens on the sink's background task, not in this turn.
+        self._render_sink.emit(
+            RenderEvent(
+                source=self.id.type,
+                content=content,
+                kind=kind,
+                session=self._session_id,
+            )
+        )
 
     @message_handler
     async def handle_message(
         self, message: GroupChatMessage, ctx: MessageContext
     ) -> None:
+        if not self._accept(message.session_id):
+            return
         self._chat_history.extend(
             [
                 UserMessage(
@@ -73,8 +142,10 @@ class BaseGroupChatAgent(RoutedAgent):
     async def handle_request_to_speak(
         self, message: RequestToSpeak, ctx: MessageContext
     ) -> None:
+        if not self._accept(message.session_id):
+            return
         # print(f"\n{'-'*80}\n{self.id.type}:", flush=True)
-        Console().print(Markdown(f"### {self.id.type}: "))
+        self._render(f"### {self.id.type}: ")
         self._chat_history.append(
             UserMessage(
                 content=f"Transferred to {self.id.type}, adopt the persona immediately.",
@@ -82,17 +153,22 @@ class BaseGroupChatAgent(RoutedAgent):
             )
         )
         completion = await self._model_client.create(
-            [self._system_message] + self._chat_history
+            await self._chat_history.messages(
+                self._system_message, self._model_client, ctx.cancellation_token
+            )
         )
+        if not self._is_current(message.session_id):
+            return
         assert isinstance(completion.content, str)
         self._chat_history.append(
             AssistantMessage(content=completion.content, source=self.id.type)
         )
-        Console().print(Markdown(completion.content))
+        self._render(completion.content)
         # print(completion.content, flush=True)
         await self.publish_message(
             GroupChatMessage(
-                body=UserMessage(content=completion.content, source=self.id.type)
+                body=UserMessage(content=completion.content, source=self.id.type),
+                session_id=message.session_id,
             ),
             topic_id=DefaultTopicId(type=self._group_chat_topic_type),
         )
@@ -104,12 +180,18 @@ class WriterAgent(BaseGroupChatAgent):
         description: str,
         group_chat_topic_type: str,
         model_client: ChatCompletionClient,
+        context_policy: ContextPolicy | None = None,
+        render_sink: RenderSink | None = None,
+        sessions: GroupChatSessionManager | None = None,
     ) -> None:
         super().__init__(
             description=description,
             group_chat_topic_type=group_chat_topic_type,
             model_client=model_client,
             system_message="You are a Writer. You produce good work.",
+            context_policy=context_policy,
+            render_sink=render_sink,
+            sessions=sessions,
         )
 
 
@@ -119,13 +201,20 @@ class EditorAgent(BaseGroupChatAgent):
         description: str,
         group_chat_topic_type: str,
         model_client: ChatCompletionClient,
+        context_policy: ContextPolicy | None = None,
+        render_sink: RenderSink | None = None,
+        sessions: GroupChatSessionManager | None = None,
     ) -> None:
         super().__init__(
             description=description,
             group_chat_topic_type=group_chat_topic_type,
             model_client=model_client,
+            context_policy=context_policy,
+            render_sink=render_sink,
+            sessions=sessions,
             system_message="You are an Editor. Plan and guide the task given by the user. Provide critical feedbacks to the draft produced by Writer. "
-            "Approve if the task is completed and the draft meets user's requirements.",
+            "Approve if the task is completed and the draft meets user's requirements, "
+            "by starting your reply with APPROVED.",
         )
 
 
@@ -136,20 +225,31 @@ class IllustratorAgent(BaseGroupChatAgent):
         group_chat_topic_type: str,
         model_client: ChatCompletionClient,
         image_client: openai.AsyncClient,
+        context_policy: ContextPolicy | None = None,
+        max_concurrent_image_calls: int = 4,
+        image_cache: ImageCache | None = None,
+        render_sink: RenderSink | None = None,
+        sessions: GroupChatSessionManager | None = None,
     ) -> None:
         super().__init__(
             description=description,
             group_chat_topic_type=group_chat_topic_type,
             model_client=model_client,
+            context_policy=context_policy,
+            render_sink=render_sink,
+            sessions=sessions,
             system_message="You are an Illustrator. You use the generate_image tool to create images given user's requirement. "
             "Make sure the images have consistent characters and style.",
         )
         self._image_client = image_client
+        self._image_cache = image_cache or ImageCache()
         self._image_gen_tool = FunctionTool(
             self._image_gen,
             name="generate_image",
             description="Call this to generate an image. ",
         )
+        # Bounds in-flight image generation requests across all tool calls.
+        self._image_gen_semaphore = asyncio.Semaphore(max_concurrent_image_calls)
 
     async def _image_gen(
         self,
@@ -159,17 +259,30 @@ class IllustratorAgent(BaseGroupChatAgent):
         scenario: str,
     ) -> str:
         prompt = f"Digital painting of a {character_appearence} character with {style_attributes}. Wearing {worn_and_carried}, {scenario}."
+        model = "imagen-3.0-generate-002"
+        size = "1024x1024"
+        # The tool returns the cache key rather than base64 image data.
+        key = ImageCache.key(prompt, model, size)
+        if key in self._image_cache:
+            return key
         response = await self._image_client.images.generate(
             prompt=prompt,
-            model="imagen-3.0-generate-002",
+            model=model,
             response_format="b64_json",
-            size="1024x1024",
+            size=size,
+        )
+        await asyncio.to_thread(
+            lambda: self._image_cache.put(
+                key, base64.b64decode(response.data[0].b64_json)  # type: ignore
+            )
         )
-        return response.data[0].b64_json  # type: ignore
+        return key
 
     @message_handler
     async def handle_request_to_speak(self, message: RequestToSpeak, ctx: MessageContext) -> None:  # type: ignore
-        Console().print(Markdown(f"### {self.id.type}: "))
+        if not self._accept(message.session_id):
+            return
+        self._render(f"### {self.id.type}: ")
         self._chat_history.append(
             UserMessage(
                 content=f"Transferred to {self.id.type}, adopt the persona immediately.",
@@ -178,37 +291,65 @@ class IllustratorAgent(BaseGroupChatAgent):
         )
         # Ensure that the image generation tool is used.
         completion = await self._model_client.create(
-            [self._system_message] + self._chat_history,
+            await self._chat_history.messages(
+                self._system_message, self._model_client, ctx.cancellation_token
+            ),
             tools=[self._image_gen_tool],
             extra_create_args={"tool_choice": "required"},
             cancellation_token=ctx.cancellation_token,
         )
+        if not self._is_current(message.session_id):
+            return
         assert isinstance(completion.content, list) and all(
             isinstance(item, FunctionCall) for item in completion.content
         )
-        images: List[str | Image] = []
-        for tool_call in completion.content:
+
+        async def generate(tool_call: FunctionCall) -> Image:
             arguments = json.loads(tool_call.arguments)
-            Console().print(arguments)
-            result = await self._image_gen_tool.run_json(
-                arguments, ctx.cancellation_token
-            )
-            image = Image.from_base64(
-                self._image_gen_tool.return_value_as_string(result)
-            )
-            image = Image.from_pil(image.image.resize((256, 256)))
+            self._render(arguments, kind="object")
+            async with self._image_gen_semaphore:
+                result = await self._image_gen_tool.run_json(
+                    arguments, ctx.cancellation_token
+                )
+            # Decoding and resizing are CPU bound, keep them off the event loop.
+            key = self._image_gen_tool.return_value_as_string(result)
+            thumbnail = await asyncio.to_thread(self._image_cache.thumbnail, key)
+            if thumbnail is None:
+                raise RuntimeError(f"Image {key} was evicted from the cache.")
+            return Image.from_pil(thumbnail)
+
+        # Fan the tool calls out so a turn takes as long as the slowest image.
+        thumbnails = await asyncio.gather(
+            *[generate(tool_call) for tool_call in completion.content]
+        )
+        if not self._is_current(message.session_id):
+            return
+        images: List[str | Image] = []
+        for image in thumbnails:
             display(image.image)  # type: ignore
             images.append(image)
         await self.publish_message(
-            GroupChatMessage(body=UserMessage(content=images, source=self.id.type)),
+            GroupChatMessage(
+                body=UserMessage(content=images, source=self.id.type),
+                session_id=message.session_id,
+            ),
             DefaultTopicId(type=self._group_chat_topic_type),
         )
 
 
-class UserAgent(RoutedAgent):
-    def __init__(self, description: str, group_chat_topic_type: str) -> None:
-        super().__init__(description=description)
+class UserAgent(SessionAgent):
+    def __init__(
+        self,
+        description: str,
+        group_chat_topic_type: str,
+        render_sink: RenderSink | None = None,
+        input_channel: HumanInputChannel | None = None,
+        sessions: GroupChatSessionManager | None = None,
+    ) -> None:
+        super().__init__(description=description, sessions=sessions)
         self._group_chat_topic_type = group_chat_topic_type
+        self._render_sink = render_sink or default_render_sink()
+        self._input_channel = input_channel or ConsoleInputChannel()
 
     @message_handler
     async def handle_message(
@@ -221,34 +362,66 @@ class UserAgent(RoutedAgent):
     async def handle_request_to_speak(
         self, message: RequestToSpeak, ctx: MessageContext
     ) -> None:
-        user_input = input("Enter your message, type 'APPROVE' to conclude the task: ")
-        Console().print(Markdown(f"### User: \n{user_input}"))
+        if not self._accept(message.session_id):
+            return
+        # Waiting for a human must not block the runtime or other sessions.
+        user_input = await self._input_channel.get_input(
+            message.session_id,
+            "Enter your message, type 'APPROVE' to conclude the task: ",
+        )
+        if not self._is_current(message.session_id):
+            return
+        self._render_sink.emit(
+            RenderEvent(
+                source=self.id.type,
+                content=f"### User: \n{user_input}",
+                session=message.session_id,
+            )
+        )
         await self.publish_message(
-            GroupChatMessage(body=UserMessage(content=user_input, source=self.id.type)),
+            GroupChatMessage(
+                body=UserMessage(content=user_input, source=self.id.type),
+                session_id=message.session_id,
+            ),
             DefaultTopicId(type=self._group_chat_topic_type),
         )
 
 
-class GroupChatManager(RoutedAgent):
+class GroupChatManager(SessionAgent):
     def __init__(
         self,
         participant_topic_types: List[str],
         model_client: ChatCompletionClient,
         participant_descriptions: List[str],
+        speaker_selector: SpeakerSelector | None = None,
+        sessions: GroupChatSessionManager | None = None,
     ) -> None:
-        super().__init__("Group chat manager")
+        super().__init__("Group chat manager", sessions=sessions)
         self._participant_topic_types = participant_topic_types
         self._model_client = model_client
-        self._chat_history: List[UserMessage] = []
+        self._transcript = GroupChatTranscript(
+            participant_topic_types, participant_descriptions
+        )
         self._participant_descriptions = participant_descriptions
         self._previous_participant_topic_type: str | None = None
+        # Without strategies the selector still caches model selections.
+        self._speaker_selector = speaker_selector or SpeakerSelector()
+
+    def _reset(self) -> None:
+        self._transcript = GroupChatTranscript(
+            self._participant_topic_types, self._participant_descriptions
+        )
+        self._previous_participant_topic_type = None
 
     @message_handler
     async def handle_message(
         self, message: GroupChatMessage, ctx: MessageContext
     ) -> None:
+        if not self._accept(message.session_id):
+            return
         assert isinstance(message.body, UserMessage)
-        self._chat_history.append(message.body)
+        # Format the new message once; earlier turns are already in the transcript.
+        self._transcript.append(message.body)
         # If the message is an approval message from the user, stop the chat.
         if message.body.source == "User":
             assert isinstance(message.body.content, str)
@@ -257,84 +430,74 @@ class GroupChatManager(RoutedAgent):
                 .strip(string.punctuation)
                 .endswith("approve")
             ):
+                if self._sessions is not None:
+                    self._sessions.complete(message.session_id)
                 return
-        # Format message history.
-        messages: List[str] = []
-        for msg in self._chat_history:
-            if isinstance(msg.content, str):
-                messages.append(f"{msg.source}: {msg.content}")
-            elif isinstance(msg.content, list):
-                line: List[str] = []
-                for item in msg.content:
-                    if isinstance(item, str):
-                        line.append(item)
-                    # else:
-                    #     line.append("[Image]")
-                messages.append(f"{msg.source}: {', '.join(line)}")
-        history = "\n".join(messages)
-        # Format roles.
-        roles = "\n".join(
-            [
-                f"{topic_type}: {description}".strip()
-                for topic_type, description in zip(
-                    self._participant_topic_types,
-                    self._participant_descriptions,
-                    strict=True,
-                )
-                if topic_type != self._previous_participant_topic_type
-            ]
-        )
-        selector_prompt = """You are in a role play game. The following roles are available:
-        {roles}.
-        Read the following conversation. Then select the next role from {participants} to play. Only return the role.
-
-        {history}
-
-        Read the above conversation. Then select the next role from {participants} to play. Only return the role.
-        """
-        system_message = UserMessage(
-            content=selector_prompt.format(
-                roles=roles,
-                history=history,
-                participants=str(
-                    [
-                        topic_type
-                        for topic_type in self._participant_topic_types
-                        if topic_type != self._previous_participant_topic_type
-                    ]
-                ),
-            ),
-            source="selector",
+        selected_topic_type = await self._speaker_selector.select(
+            self._transcript,
+            self._previous_participant_topic_type,
+            message.body,
+            self._model_client,
+            cancellation_token=ctx.cancellation_token,
         )
-        completion = await self._model_client.create(
-            [system_message], cancellation_token=ctx.cancellation_token
+        if not self._is_current(message.session_id):
+            return
+        self._previous_participant_topic_type = selected_topic_type
+        await self.publish_message(
+            RequestToSpeak(session_id=message.session_id),
+            DefaultTopicId(type=selected_topic_type),
         )
-        assert isinstance(completion.content, str)
-        selected_topic_type: str
-        for topic_type in self._participant_topic_types:
-            if topic_type.lower() in completion.content.lower():
-                selected_topic_type = topic_type
-                self._previous_participant_topic_type = selected_topic_type
-                await self.publish_message(
-                    RequestToSpeak(), DefaultTopicId(type=selected_topic_type)
-                )
-                return
-        raise ValueError(f"Invalid role selected: {completion.content}")
 
 
-async def main() -> None:
-    runtime = SingleThreadedAgentRuntime()
+editor_topic_type = "Editor"
+writer_topic_type = "Writer"
+illustrator_topic_type = "Illustrator"
+user_topic_type = "User"
+group_chat_topic_type = "group_chat"
+
+editor_description = "Editor for planning and reviewing the content."
+writer_description = "Writer for creating any text content."
+user_description = "User for providing final approval."
+illustrator_description = "An illustrator for creating images."
+
+
+def gemini_model_client() -> ChatCompletionClient:
+    # Shared by every agent and session, so connections are reused across turns.
+    return get_model_client(
+        "gemini-2.0-flash",
+        api_key=os.environ.get("GEMINI_API_KEY"),
+        # api_key="YOUR_API_KEY",
+    )
+
+
+def gemini_image_client() -> openai.AsyncClient:
+    return get_openai_client(
+        # api_key="YOUR_API_KEY",
+        # model="imagen-3.0-generate-002",
+        api_key=os.environ.get("GEMINI_API_KEY"),
+    )
 
-    editor_topic_type = "Editor"
-    writer_topic_type = "Writer"
-    illustrator_topic_type = "Illustrator"
-    user_topic_type = "User"
-    group_chat_topic_type = "group_chat"
 
-    editor_description = "Editor for planning and reviewing the content."
-    writer_description = "Writer for creating any text content."
-    user_description = "User for providing final approval."
-    illustrator_description = "An illustrator for creating images."
+async def register_group_chat(
+    runtime: SingleThreadedAgentRuntime,
+    model_client_factory: Callable[[], ChatCompletionClient] = gemini_model_client,
+    image_client_factory: Callable[[], openai.AsyncClient] = gemini_image_client,
+    input_channel: HumanInputChannel | None = None,
+    sessions: GroupChatSessionManager | None = None,
+    render_sink: RenderSink | None = None,
+) -> SpeakerSelector:
+    """Register the group chat agents and their subscriptions on the runtime.
+
+    All agents are subscribed by topic type, so every slot that ``sessions``
+    publishes to gets its own agent instances, reused by the slot's sessions.
+    """
+    # Bound what each participant sends per turn; older turns are summarized.
+    context_policy = ContextPolicy(max_messages=20, max_tokens=4000, summarize=True)
+    # Shared so re-runs of a story reuse images generated in earlier sessions.
+    image_cache = ImageCache(".image_cache")
+    # One channel for every session, so only one reader uses stdin.
+    if input_channel is None:
+        input_channel = ConsoleInputChannel()
 
     editor_agent_type = await EditorAgent.register(
         runtime,
@@ -342,11 +505,10 @@ async def main() -> None:
         lambda: EditorAgent(
             description=editor_description,
             group_chat_topic_type=group_chat_topic_type,
-            model_client=OpenAIChatCompletionClient(
-                model="gemini-2.0-flash",
-                api_key=os.environ.get("GEMINI_API_KEY"),
-                # api_key="YOUR_API_KEY",
-            ),
+            context_policy=context_policy,
+            render_sink=render_sink,
+            model_client=model_client_factory(),
+            sessions=sessions,
         ),
     )
     await runtime.add_subscription(
@@ -366,11 +528,10 @@ async def main() -> None:
         lambda: WriterAgent(
             description=writer_description,
             group_chat_topic_type=group_chat_topic_type,
-            model_client=OpenAIChatCompletionClient(
-                model="gemini-2.0-flash",
-                api_key=os.environ.get("GEMINI_API_KEY"),
-                # api_key="YOUR_API_KEY",
-            ),
+            context_policy=context_policy,
+            render_sink=render_sink,
+            model_client=model_client_factory(),
+            sessions=sessions,
         ),
     )
     await runtime.add_subscription(
@@ -390,15 +551,12 @@ async def main() -> None:
         lambda: IllustratorAgent(
             description=illustrator_description,
             group_chat_topic_type=group_chat_topic_type,
-            model_client=OpenAIChatCompletionClient(
-                model="gemini-2.0-flash",
-                api_key=os.environ.get("GEMINI_API_KEY"),
-            ),
-            image_client=openai.AsyncClient(
-                # api_key="YOUR_API_KEY",
-                # model="imagen-3.0-generate-002",
-                api_key=os.environ.get("GEMINI_API_KEY"),
-            ),
+            context_policy=context_policy,
+            render_sink=render_sink,
+            model_client=model_client_factory(),
+            sessions=sessions,
+            image_client=image_client_factory(),
+            image_cache=image_cache,
         ),
     )
     await runtime.add_subscription(
@@ -416,7 +574,11 @@ async def main() -> None:
         runtime,
         user_topic_type,
         lambda: UserAgent(
-            description=user_description, group_chat_topic_type=group_chat_topic_type
+            description=user_description,
+            group_chat_topic_type=group_chat_topic_type,
+            render_sink=render_sink,
+            input_channel=input_channel,
+            sessions=sessions,
         ),
     )
     await runtime.add_subscription(
@@ -428,6 +590,32 @@ async def main() -> None:
         )
     )
 
+    # Writer -> Editor -> User, with the Editor either sending the draft back
+    # or handing it to the User once it approves. Only an explicit verdict at
+    # the start of the reply counts, so feedback like "I can't approve this
+    # yet" doesn't end the draft. Only unclear Editor replies need a selector
+    # completion.
+    speaker_selector = SpeakerSelector(
+        strategies=[
+            TransitionGraphStrategy(
+                {
+                    user_topic_type: [writer_topic_type],
+                    writer_topic_type: [editor_topic_type],
+                    editor_topic_type: [writer_topic_type, user_topic_type],
+                }
+            ),
+            KeywordRuleStrategy(
+                [
+                    (
+                        re.compile(r"^\W*APPROVED\b"),
+                        user_topic_type,
+                        [editor_topic_type],
+                    ),
+                    ("revise", writer_topic_type, [editor_topic_type]),
+                ]
+            ),
+        ]
+    )
     group_chat_manager_type = await GroupChatManager.register(
         runtime,
         "group_chat_manager",
@@ -438,17 +626,15 @@ async def main() -> None:
                 editor_topic_type,
                 user_topic_type,
             ],
-            model_client=OpenAIChatCompletionClient(
-                model="gemini-2.0-flash",
-                api_key=os.environ.get("GEMINI_API_KEY"),
-                # api_key="YOUR_API_KEY",
-            ),
+            model_client=model_client_factory(),
             participant_descriptions=[
                 writer_description,
                 # illustrator_description,
                 editor_description,
                 user_description,
             ],
+            speaker_selector=speaker_selector,
+            sessions=sessions,
         ),
     )
     await runtime.add_subscription(
@@ -456,20 +642,42 @@ async def main() -> None:
             topic_type=group_chat_topic_type, agent_type=group_chat_manager_type.type
         )
     )
+    return speaker_selector
 
-    runtime.start()
 
-    session_id = str(uuid.uuid4())
-    await runtime.publish_message(
-        GroupChatMessage(
-            body=UserMessage(
-                content="Please write a short story about the gingerbread man.",
-                source="User",
-            )
-        ),
-        TopicId(type=group_chat_topic_type, source=session_id),
+def story_task(task: str, session_id: str) -> GroupChatMessage:
+    return GroupChatMessage(
+        body=UserMessage(content=task, source="User"), session_id=session_id
     )
+
+
+async def main() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    sessions = GroupChatSessionManager(runtime, group_chat_topic_type, story_task)
+    # GROUP_CHAT_HEADLESS=1 skips rich rendering and only writes a JSONL log.
+    if os.environ.get("GROUP_CHAT_HEADLESS") == "1":
+        render_sink = RenderSink(rich=False, jsonl_path="group_chat.jsonl")
+    else:
+        render_sink = RenderSink()
+    # GROUP_CHAT_AUTO_APPROVE=1 runs without a human in the loop.
+    if os.environ.get("GROUP_CHAT_AUTO_APPROVE") == "1":
+        input_channel: HumanInputChannel = AutoApproveInputChannel()
+    else:
+        input_channel = ConsoleInputChannel()
+    speaker_selector = await register_group_chat(
+        runtime,
+        sessions=sessions,
+        render_sink=render_sink,
+        input_channel=input_channel,
+    )
+
+    runtime.start()
+
+    await sessions.run_session("Please write a short story about the gingerbread man.")
     await runtime.stop_when_idle()
+    await render_sink.close()
+    await close_model_clients()
+    print(speaker_selector.stats)
 
 
 if __name__ == "__main__":
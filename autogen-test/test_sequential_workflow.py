@@ -1,8 +1,16 @@
 import os
+import argparse
 import asyncio
+import csv
+import json
+import time
+from abc import abstractmethod
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
 from autogen_core import (
+    FunctionCall,
     MessageContext,
     RoutedAgent,
     SingleThreadedAgentRuntime,
@@ -11,13 +19,26 @@ from autogen_core import (
     message_handler,
     type_subscription,
 )
-from autogen_core.models import ChatCompletionClient, SystemMessage, UserMessage
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    SystemMessage,
+    UserMessage,
+)
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
+from message_streaming import ChunkAssembler, MessageChunk
+from pipeline_stages import PipelineStage, monitor, report
+from response_cache import CachedChatCompletionClient, cached_client
+from semantic_cache import SemanticCachedChatCompletionClient
+
 
 @dataclass
 class Message:
     content: str
+    # The input item this belongs to; one agent handles many items in turn.
+    item_id: str = ""
 
 
 concept_extractor_topic_type = "ConceptExtractorAgent"
@@ -26,152 +47,371 @@ format_proof_topic_type = "FormatProofAgent"
 user_topic_type = "User"
 
 
+class StageAgent(RoutedAgent):
+    """An LLM stage of the pipeline: prompt the model, pass the result on.
+
+    Input arrives either as a whole ``Message`` or, from a streaming stage, as
+    ``MessageChunk``s that are reassembled first, per item. With ``stream=True`` the
+    stage's own output is published chunk by chunk as the model produces it,
+    so the final stage can show the copy while it is being written.
+    """
+
+    def __init__(
+        self,
+        description: str,
+        system_message: str,
+        next_topic_type: str,
+        model_client: ChatCompletionClient,
+        stage: PipelineStage,
+        next_stage: PipelineStage,
+        verbose: bool = True,
+        stream: bool = False,
+    ) -> None:
+        super().__init__(description)
+        self._system_message = SystemMessage(content=system_message)
+        self._next_topic_type = next_topic_type
+        self._model_client = model_client
+        self._stage = stage
+        self._next_stage = next_stage
+        self._verbose = verbose
+        self._stream = stream
+        self._assemblers: Dict[str, ChunkAssembler] = {}
+
+    @abstractmethod
+    def _prompt(self, text: str) -> str: ...
+
+    @message_handler
+    async def handle_message(self, message: Message, ctx: MessageContext) -> None:
+        await self._run(message.item_id, message.content, ctx)
+
+    @message_handler
+    async def handle_chunk(self, message: MessageChunk, ctx: MessageContext) -> None:
+        assembler = self._assemblers.setdefault(message.item_id, ChunkAssembler())
+        assembler.add(message)
+        if assembler.done:
+            del self._assemblers[message.item_id]
+            await self._run(message.item_id, assembler.text, ctx)
+
+    async def _publish(self, message: Message | MessageChunk) -> None:
+        await self.publish_message(
+            message, topic_id=TopicId(self._next_topic_type, source=self.id.key)
+        )
+
+    async def _run(self, item_id: str, text: str, ctx: MessageContext) -> None:
+        async with self._stage.admitted():
+            async with self._stage.worker():
+                messages = [
+                    self._system_message,
+                    UserMessage(content=self._prompt(text), source=self.id.key),
+                ]
+                if self._stream:
+                    response = await self._stream_response(messages, item_id, ctx)
+                else:
+                    llm_result = await self._model_client.create(
+                        messages=messages,
+                        cancellation_token=ctx.cancellation_token,
+                    )
+                    response = llm_result.content
+            assert isinstance(response, str)
+            if self._verbose:
+                print(f"{'-'*80}\n{self.id.type}:\n{response}")
+
+            if not self._stream:
+                # Blocks while the next stage is full, pushing back upstream.
+                await self._stage.forward_to(self._next_stage)
+                await self._publish(Message(response, item_id))
+
+    async def _stream_response(
+        self, messages: List[LLMMessage], item_id: str, ctx: MessageContext
+    ) -> str | List[FunctionCall]:
+        index = 0
+        forwarded = False
+        response: str | List[FunctionCall] = ""
+        async for chunk in self._model_client.create_stream(
+            messages=messages, cancellation_token=ctx.cancellation_token
+        ):
+            if isinstance(chunk, CreateResult):
+                response = chunk.content
+                continue
+            if not forwarded:
+                # The item enters the next stage with its first chunk.
+                await self._stage.forward_to(self._next_stage)
+                forwarded = True
+            await self._publish(MessageChunk(index, chunk, item_id=item_id))
+            index += 1
+        if not forwarded:
+            await self._stage.forward_to(self._next_stage)
+        await self._publish(MessageChunk(index, "", done=True, item_id=item_id))
+        return response
+
+
 @type_subscription(topic_type=concept_extractor_topic_type)
-class ConceptExtractorAgent(RoutedAgent):
-    def __init__(self, model_client: ChatCompletionClient) -> None:
-        super().__init__("A concept extractor agent.")
-        self._system_message = SystemMessage(
-            content=(
+class ConceptExtractorAgent(StageAgent):
+    def __init__(
+        self,
+        model_client: ChatCompletionClient,
+        stage: PipelineStage,
+        next_stage: PipelineStage,
+        verbose: bool = True,
+        stream: bool = False,
+    ) -> None:
+        super().__init__(
+            "A concept extractor agent.",
+            (
                 "You are a marketing analyst. Given a product description, identify:\n"
                 "- Key features\n"
                 "- Target audience\n"
                 "- Unique selling points\n\n"
-            )
-        )
-        self._model_client = model_client
-
-    @message_handler
-    async def handle_user_description(
-        self, message: Message, ctx: MessageContext
-    ) -> None:
-        prompt = f"Product description: {message.content}"
-        llm_result = await self._model_client.create(
-            messages=[
-                self._system_message,
-                UserMessage(content=prompt, source=self.id.key),
-            ],
-            cancellation_token=ctx.cancellation_token,
+            ),
+            writer_topic_type,
+            model_client,
+            stage,
+            next_stage,
+            verbose,
+            stream,
         )
-        response = llm_result.content
-        assert isinstance(response, str)
-        print(f"{'-'*80}\n{self.id.type}:\n{response}")
 
-        await self.publish_message(
-            Message(response), topic_id=TopicId(writer_topic_type, source=self.id.key)
-        )
+    def _prompt(self, text: str) -> str:
+        return f"Product description: {text}"
 
 
 @type_subscription(topic_type=writer_topic_type)
-class WriterAgent(RoutedAgent):
-    def __init__(self, model_client: ChatCompletionClient) -> None:
-        super().__init__("A writer agent.")
-        self._system_message = SystemMessage(
-            content=(
+class WriterAgent(StageAgent):
+    def __init__(
+        self,
+        model_client: ChatCompletionClient,
+        stage: PipelineStage,
+        next_stage: PipelineStage,
+        verbose: bool = True,
+        stream: bool = False,
+    ) -> None:
+        super().__init__(
+            "A writer agent.",
+            (
                 "You are a marketing copywriter. Given a block of text describing features, audience, and USPs, "
                 "compose a compelling marketing copy (like a newsletter section) that highlights these points. "
                 "Output should be short (around 150 words), output just the copy as a single text block."
-            )
+            ),
+            format_proof_topic_type,
+            model_client,
+            stage,
+            next_stage,
+            verbose,
+            stream,
         )
-        self._model_client = model_client
 
-    @message_handler
-    async def handle_intermediate_text(
-        self, message: Message, ctx: MessageContext
-    ) -> None:
-        prompt = f"Below is the info about the product:\n\n{message.content}"
-
-        llm_result = await self._model_client.create(
-            messages=[
-                self._system_message,
-                UserMessage(content=prompt, source=self.id.key),
-            ],
-            cancellation_token=ctx.cancellation_token,
-        )
-        response = llm_result.content
-        assert isinstance(response, str)
-        print(f"{'-'*80}\n{self.id.type}:\n{response}")
-
-        await self.publish_message(
-            Message(response),
-            topic_id=TopicId(format_proof_topic_type, source=self.id.key),
-        )
+    def _prompt(self, text: str) -> str:
+        return f"Below is the info about the product:\n\n{text}"
 
 
 @type_subscription(topic_type=format_proof_topic_type)
-class FormatProofAgent(RoutedAgent):
-    def __init__(self, model_client: ChatCompletionClient) -> None:
-        super().__init__("A format & proof agent.")
-        self._system_message = SystemMessage(
-            content=(
+class FormatProofAgent(StageAgent):
+    def __init__(
+        self,
+        model_client: ChatCompletionClient,
+        stage: PipelineStage,
+        next_stage: PipelineStage,
+        verbose: bool = True,
+        stream: bool = False,
+    ) -> None:
+        super().__init__(
+            "A format & proof agent.",
+            (
                 "You are an editor. Given the draft copy, correct grammar, improve clarity, ensure consistent tone, "
                 "give format and make it polished. Output the final improved copy as a single text block."
-            )
-        )
-        self._model_client = model_client
-
-    @message_handler
-    async def handle_intermediate_text(
-        self, message: Message, ctx: MessageContext
-    ) -> None:
-        prompt = f"Draft copy:\n{message.content}."
-        llm_result = await self._model_client.create(
-            messages=[
-                self._system_message,
-                UserMessage(content=prompt, source=self.id.key),
-            ],
-            cancellation_token=ctx.cancellation_token,
+            ),
+            user_topic_type,
+            model_client,
+            stage,
+            next_stage,
+            verbose,
+            stream,
         )
-        response = llm_result.content
-        assert isinstance(response, str)
-        print(f"{'-'*80}\n{self.id.type}:\n{response}")
 
-        await self.publish_message(
-            Message(response), topic_id=TopicId(user_topic_type, source=self.id.key)
-        )
+    def _prompt(self, text: str) -> str:
+        return f"Draft copy:\n{text}."
 
 
 @type_subscription(topic_type=user_topic_type)
 class UserAgent(RoutedAgent):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        stage: PipelineStage,
+        on_final_copy: Callable[[str, str], None] | None = None,
+        on_first_output: Callable[[str], None] | None = None,
+    ) -> None:
         super().__init__("A user agent that outputs the final copy to the user.")
+        self._stage = stage
+        self._on_final_copy = on_final_copy
+        self._on_first_output = on_first_output
+        self._assemblers: Dict[str, ChunkAssembler] = {}
+        # Items whose first output has been seen.
+        self._started: Set[str] = set()
+
+    def _first_output(self, item_id: str) -> None:
+        if item_id not in self._started:
+            self._started.add(item_id)
+            if self._on_first_output is not None:
+                self._on_first_output(item_id)
 
     @message_handler
     async def handle_final_copy(self, message: Message, ctx: MessageContext) -> None:
-        print(f"\n{'-'*80}\n{self.id.type} received final copy:\n{message.content}")
+        self._first_output(message.item_id)
+        self._started.discard(message.item_id)
+        async with self._stage.admitted():
+            async with self._stage.worker():
+                # In batch mode the copy is handed back to the runner instead of
+                # printed.
+                if self._on_final_copy is not None:
+                    self._on_final_copy(message.item_id, message.content)
+                    return
+                print(
+                    f"\n{'-'*80}\n{self.id.type} received final copy:\n"
+                    f"{message.content}"
+                )
 
+    @message_handler
+    async def handle_final_copy_chunk(
+        self, message: MessageChunk, ctx: MessageContext
+    ) -> None:
+        assembler = self._assemblers.setdefault(message.item_id, ChunkAssembler())
+        text = "".join(assembler.add(message))
+        if text:
+            if message.item_id not in self._started and self._on_final_copy is None:
+                print(f"\n{'-'*80}\n{self.id.type} receiving final copy:")
+            self._first_output(message.item_id)
+            if self._on_final_copy is None:
+                print(text, end="", flush=True)
+        if not assembler.done:
+            return
+        del self._assemblers[message.item_id]
+        self._started.discard(message.item_id)
+        async with self._stage.admitted():
+            async with self._stage.worker():
+                if self._on_final_copy is not None:
+                    self._on_final_copy(message.item_id, assembler.text)
+                else:
+                    print()
+
+
+def gemini_model_client() -> ChatCompletionClient:
+    # The same product description always yields the same stage prompts, so
+    # re-runs are served from the response cache. Built on first use, so
+    # importing this module doesn't create the cache file.
+    return cached_client(
+        OpenAIChatCompletionClient(
+            model="gemini-2.0-flash",
+            api_key=os.environ.get("GEMINI_API_KEY"),
+            # api_key="YOUR_API_KEY"
+        )
+    )
 
-model_client = OpenAIChatCompletionClient(
-    model="gemini-2.0-flash",
-    api_key=os.environ.get("GEMINI_API_KEY"),
-    # api_key="YOUR_API_KEY"
-)
 
 runtime = SingleThreadedAgentRuntime()
 
 
-async def main() -> None:
+def make_stages(
+    concept_extractor_workers: int = 4,
+    writer_workers: int = 4,
+    format_proof_workers: int = 4,
+    queue_size: int = 16,
+) -> Dict[str, PipelineStage]:
+    return {
+        concept_extractor_topic_type: PipelineStage(
+            concept_extractor_topic_type, concept_extractor_workers, queue_size
+        ),
+        writer_topic_type: PipelineStage(writer_topic_type, writer_workers, queue_size),
+        format_proof_topic_type: PipelineStage(
+            format_proof_topic_type, format_proof_workers, queue_size
+        ),
+        # Printing or collecting the final copy is cheap.
+        user_topic_type: PipelineStage(user_topic_type, 16, queue_size),
+    }
+
+
+async def register_agents(
+    runtime: SingleThreadedAgentRuntime,
+    stages: Dict[str, PipelineStage],
+    on_final_copy: Callable[[str, str], None] | None = None,
+    verbose: bool = True,
+    client: ChatCompletionClient | None = None,
+    rewrite_client: ChatCompletionClient | None = None,
+    stream: bool = False,
+    on_first_output: Callable[[str], None] | None = None,
+) -> None:
+    """Register one agent type per stage.
+
+    ``client`` defaults to the cached Gemini client. ``rewrite_client`` serves
+    the writer and format/proof stages, whose prompts often differ only in
+    wording; it defaults to ``client``. With ``stream`` every stage publishes
+    its output chunk by chunk.
+    """
+    client = client or gemini_model_client()
+    rewrite_client = rewrite_client or client
     await ConceptExtractorAgent.register(
         runtime,
         type=concept_extractor_topic_type,
-        factory=lambda: ConceptExtractorAgent(model_client=model_client),
+        factory=lambda: ConceptExtractorAgent(
+            model_client=client,
+            stage=stages[concept_extractor_topic_type],
+            next_stage=stages[writer_topic_type],
+            verbose=verbose,
+            stream=stream,
+        ),
     )
 
     await WriterAgent.register(
         runtime,
         type=writer_topic_type,
-        factory=lambda: WriterAgent(model_client=model_client),
+        factory=lambda: WriterAgent(
+            model_client=rewrite_client,
+            stage=stages[writer_topic_type],
+            next_stage=stages[format_proof_topic_type],
+            verbose=verbose,
+            stream=stream,
+        ),
     )
 
     await FormatProofAgent.register(
         runtime,
         type=format_proof_topic_type,
-        factory=lambda: FormatProofAgent(model_client=model_client),
+        factory=lambda: FormatProofAgent(
+            model_client=rewrite_client,
+            stage=stages[format_proof_topic_type],
+            next_stage=stages[user_topic_type],
+            verbose=verbose,
+            stream=stream,
+        ),
     )
 
-    await UserAgent.register(runtime, type=user_topic_type, factory=lambda: UserAgent())
+    await UserAgent.register(
+        runtime,
+        type=user_topic_type,
+        factory=lambda: UserAgent(
+            stage=stages[user_topic_type],
+            on_final_copy=on_final_copy,
+            on_first_output=on_first_output,
+        ),
+    )
+
+
+async def main(stream: bool = False) -> None:
+    stages = make_stages()
+    first_output: List[float] = []
+    await register_agents(
+        runtime,
+        stages,
+        stream=stream,
+        # The per-stage output would interleave with the streamed copy.
+        verbose=not stream,
+        on_first_output=lambda source: first_output.append(time.perf_counter()),
+    )
 
     runtime.start()
 
+    # Every item is admitted to the first stage before it is published.
+    start = time.perf_counter()
+    await stages[concept_extractor_topic_type].admit()
     await runtime.publish_message(
         Message(
             content="An eco-friendly stainless steel water bottle that keeps drinks cold for 24 hours"
@@ -180,7 +420,190 @@ async def main() -> None:
     )
 
     await runtime.stop_when_idle()
+    elapsed = time.perf_counter() - start
+    if first_output:
+        print(
+            f"\nFirst output after {first_output[0] - start:.1f}s, "
+            f"done in {elapsed:.1f}s."
+        )
+
+
+def read_products(path: str | Path) -> Iterator[Tuple[str, str]]:
+    """Yield ``(id, description)`` pairs from a JSONL or CSV file.
+
+    Each record needs a ``description`` field; ``id`` is optional and
+    defaults to the record's position in the file.
+    """
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            records: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for index, record in enumerate(records):
+            yield str(record.get("id", index)), record["description"]
+
+
+async def run_batch(
+    input_path: str | Path,
+    output_path: str | Path,
+    max_in_flight: int = 16,
+    item_timeout: float = 300.0,
+    stages: Dict[str, PipelineStage] | None = None,
+    report_interval: float = 10.0,
+    client: ChatCompletionClient | None = None,
+    semantic_cache_threshold: float | None = None,
+    stream: bool = False,
+) -> None:
+    """Stream every product description through the pipeline.
+
+    Up to ``max_in_flight`` items are in the pipeline at once. Each runs under
+    one of ``max_in_flight`` reusable ``TopicId`` sources, with its id carried
+    in the messages, so the runtime never holds more than that many agents
+    per stage however long the input is. Results are appended to
+    ``output_path`` as JSONL in completion order.
+
+    Input is only read as fast as the first stage admits items, so a slow
+    stage throttles reading through the stage queues and memory stays flat.
+    Stage queue depths and service times are printed every
+    ``report_interval`` seconds and once at the end.
+
+    With ``semantic_cache_threshold`` set, writer and format/proof prompts
+    that are at least that similar to an earlier one reuse its completion.
+    With ``stream`` the stages publish their output chunk by chunk, which
+    shortens the reported mean time to the first output of each final copy.
+    """
+    stages = stages or make_stages()
+    client = client or gemini_model_client()
+    loop = asyncio.get_running_loop()
+    pending: Dict[str, asyncio.Future[str]] = {}
+    published: Dict[str, float] = {}
+    first_output: List[float] = []
+
+    def on_first_output(item_id: str) -> None:
+        if item_id in published:
+            first_output.append(time.perf_counter() - published.pop(item_id))
+
+    def on_final_copy(item_id: str, content: str) -> None:
+        # Copies of items that already timed out are dropped.
+        future = pending.get(item_id)
+        if future is not None and not future.done():
+            future.set_result(content)
+
+    rewrite_client = None
+    if semantic_cache_threshold is not None:
+        rewrite_client = SemanticCachedChatCompletionClient(
+            client, threshold=semantic_cache_threshold
+        )
+    await register_agents(
+        runtime,
+        stages,
+        on_final_copy=on_final_copy,
+        verbose=False,
+        client=client,
+        rewrite_client=rewrite_client,
+        stream=stream,
+        on_first_output=on_first_output,
+    )
+    runtime.start()
+    reporter = asyncio.create_task(monitor(stages, report_interval))
+
+    # A slot's agents are reused once its item is done.
+    free_slots: asyncio.Queue[str] = asyncio.Queue()
+    for slot in range(max_in_flight):
+        free_slots.put_nowait(f"slot-{slot}")
+    completed = 0
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as output:
+
+        async def process(slot: str, key: str, item_id: str, description: str) -> None:
+            nonlocal completed
+            record: Dict[str, Any] = {"id": item_id, "description": description}
+            try:
+                record["copy"] = await asyncio.wait_for(pending[key], item_timeout)
+            except asyncio.TimeoutError:
+                record["error"] = f"No final copy after {item_timeout}s."
+            finally:
+                del pending[key]
+                published.pop(key, None)
+                free_slots.put_nowait(slot)
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            completed += 1
+
+        tasks: List[asyncio.Task[None]] = []
+        # Keys are positional so duplicate ids in the input can't collide.
+        for index, (item_id, description) in enumerate(read_products(input_path)):
+            slot = await free_slots.get()
+            await stages[concept_extractor_topic_type].admit()
+            key = f"item-{index}"
+            pending[key] = loop.create_future()
+            published[key] = time.perf_counter()
+            await runtime.publish_message(
+                Message(content=description, item_id=key),
+                topic_id=TopicId(concept_extractor_topic_type, source=slot),
+            )
+            tasks.append(asyncio.create_task(process(slot, key, item_id, description)))
+            tasks = [task for task in tasks if not task.done()]
+        await asyncio.gather(*tasks)
+
+    await runtime.stop_when_idle()
+    reporter.cancel()
+    elapsed = time.perf_counter() - start
+    print(report(stages))
+    if isinstance(client, CachedChatCompletionClient):
+        print(client.stats)
+    if rewrite_client is not None:
+        print(rewrite_client.stats)
+    if first_output:
+        print(
+            f"Mean time to first output: {sum(first_output) / len(first_output):.2f}s"
+        )
+    print(
+        f"Processed {completed} items in {elapsed:.1f}s "
+        f"({completed / elapsed * 60:.1f} items/minute, max in flight {max_in_flight})."
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Sequential marketing copy workflow.")
+    parser.add_argument(
+        "--batch", help="JSONL or CSV file of product descriptions to process."
+    )
+    parser.add_argument("--output", default="marketing_copy.jsonl")
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--concept-extractor-workers", type=int, default=4)
+    parser.add_argument("--writer-workers", type=int, default=4)
+    parser.add_argument("--format-proof-workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    parser.add_argument(
+        "--semantic-cache-threshold",
+        type=float,
+        help="Reuse writer/proof completions for prompts at least this similar.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Forward each stage's output downstream as it is generated.",
+    )
+    args = parser.parse_args()
+    if args.batch:
+        asyncio.run(
+            run_batch(
+                args.batch,
+                args.output,
+                args.max_in_flight,
+                stages=make_stages(
+                    args.concept_extractor_workers,
+                    args.writer_workers,
+                    args.format_proof_workers,
+                    args.queue_size,
+                ),
+                report_interval=args.report_interval,
+                semantic_cache_threshold=args.semantic_cache_threshold,
+                stream=args.stream,
+            )
+        )
+    else:
+        asyncio.run(main(args.stream))
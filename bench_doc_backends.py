@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+from doc_batch import BatchExtractor, ExtractionOptions, page_count, read_sources
+from tika_client import (
+    DEFAULT_TIKA_URL,
+    ExtractionResult,
+    TikaClient,
+    docling_extract,
+    report,
+)
+
+
+def _pages(sources: List[Path]) -> int:
+    total = 0
+    for source in sources:
+        try:
+            total += page_count(source)
+        except Exception:
+            pass
+    return total
+
+
+def summary(
+    backend: str, results: List[ExtractionResult], elapsed: float, pages: int
+) -> str:
+    succeeded = sum(result.status == "success" for result in results)
+    size = sum(result.size for result in results)
+    return (
+        f"{backend:<8} {elapsed:8.1f}s  {succeeded}/{len(results)} documents  "
+        f"{len(results) / elapsed if elapsed else 0.0:6.2f} docs/s  "
+        f"{pages / elapsed if elapsed else 0.0:7.2f} pages/s  {size} bytes of output"
+    )
+
+
+async def main(
+    corpus: str, output_dir: str, tika_url: str, max_in_flight: int, workers: int
+) -> None:
+    sources = read_sources(corpus)
+    pages = _pages(sources)
+    print(f"{len(sources)} documents, {pages} pages")
+
+    async with TikaClient(tika_url, max_in_flight=max_in_flight) as tika:
+        if not await tika.available():
+            raise SystemExit(f"Tika server not reachable at {tika_url}")
+        start = time.perf_counter()
+        tika_results = await tika.extract_all(sources, Path(output_dir) / "tika")
+        tika_elapsed = time.perf_counter() - start
+    print(report(tika_results, tika_elapsed))
+
+    with BatchExtractor(ExtractionOptions(), workers) as extractor:
+        # Load the models first so the timing is about conversion.
+        extractor.warm_up()
+        start = time.perf_counter()
+        docling_results = docling_extract(
+            extractor, [str(source) for source in sources], Path(output_dir) / "docling"
+        )
+        docling_elapsed = time.perf_counter() - start
+    print(report(docling_results, docling_elapsed))
+
+    print(summary("tika", tika_results, tika_elapsed, pages))
+    print(summary("docling", docling_results, docling_elapsed, pages))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(
+        description="Compare Tika and docling extraction on the same corpus."
+    )
+    parser.add_argument("corpus", help="Directory of PDFs or manifest file.")
+    parser.add_argument("--output-dir", default="bench_extracted")
+    parser.add_argument("--tika-url", default=DEFAULT_TIKA_URL)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.corpus,
+            args.output_dir,
+            args.tika_url,
+            args.max_in_flight,
+            args.workers,
+        )
+    )
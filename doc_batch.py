@@ -0,0 +1,710 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from docling.datamodel.accelerator_options import AcceleratorOptions
+from docling.datamodel.base_models import ConversionStatus, InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+from docling.datamodel.settings import DEFAULT_PAGE_RANGE
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling_core.types.doc import DoclingDocument
+import pypdfium2 as pdfium
+
+from doc_cache import DEFAULT_CACHE_DIR, ConversionCache
+from doc_table_routing import NO_TABLES, TABLE_ROUTES, TableRouter, route_ranges
+from markdown_export import combine_documents, write_markdown
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExtractionOptions:
+    """The PDF pipeline settings used by ``doc_extraction.ipynb``."""
+
+    do_table_structure: bool = True
+    table_mode: TableFormerMode = TableFormerMode.ACCURATE
+    do_cell_matching: bool = True
+    # Torch threads per converter; workers * num_threads should fit the cores.
+    num_threads: int = 4
+
+    def pipeline_options(self) -> PdfPipelineOptions:
+        pipeline_options = PdfPipelineOptions(
+            do_table_structure=self.do_table_structure
+        )
+        pipeline_options.table_structure_options.mode = self.table_mode
+        pipeline_options.table_structure_options.do_cell_matching = (
+            self.do_cell_matching
+        )
+        pipeline_options.accelerator_options = AcceleratorOptions(
+            num_threads=self.num_threads
+        )
+        return pipeline_options
+
+    @property
+    def table_route(self) -> str:
+        """``"none"``, ``"fast"`` or ``"accurate"``."""
+        return self.table_mode.value if self.do_table_structure else NO_TABLES
+
+    def for_route(self, route: str) -> "ExtractionOptions":
+        if route == NO_TABLES:
+            return replace(self, do_table_structure=False)
+        return replace(self, do_table_structure=True, table_mode=TableFormerMode(route))
+
+
+def make_converter(options: ExtractionOptions) -> DocumentConverter:
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=options.pipeline_options()
+            )
+        }
+    )
+
+
+@dataclass
+class DocumentTiming:
+    source: str
+    status: str
+    pages: int
+    duration: float
+    worker: int
+    error: Optional[str] = None
+    shards: int = 1
+    cached: bool = False
+    # Pages and conversion seconds per table route.
+    route_pages: Dict[str, int] = field(default_factory=dict)
+    route_seconds: Dict[str, float] = field(default_factory=dict)
+    # Outputs are <output_dir>/<output_name>.md and .json.
+    output_name: Optional[str] = None
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.duration if self.duration else 0.0
+
+
+@dataclass
+class BatchReport:
+    timings: List[DocumentTiming]
+    workers: int
+    elapsed: float
+
+    def _route_totals(self) -> Tuple[Dict[str, int], Dict[str, float]]:
+        pages: Dict[str, int] = {}
+        seconds: Dict[str, float] = {}
+        for timing in self.timings:
+            for route, count in timing.route_pages.items():
+                pages[route] = pages.get(route, 0) + count
+                seconds[route] = seconds.get(route, 0.0) + timing.route_seconds[route]
+        return pages, seconds
+
+    def time_saved(self, timing: DocumentTiming) -> Optional[float]:
+        """Estimated seconds saved by not converting every page in ACCURATE.
+
+        Uses this batch's ACCURATE seconds per page; ``None`` without any.
+        """
+        pages, seconds = self._route_totals()
+        accurate = TableFormerMode.ACCURATE.value
+        if not pages.get(accurate):
+            return None
+        per_page = seconds[accurate] / pages[accurate]
+        return sum(
+            count * per_page - timing.route_seconds[route]
+            for route, count in timing.route_pages.items()
+            if route != accurate
+        )
+
+    def __str__(self) -> str:
+        pages_by_route, _ = self._route_totals()
+        routed = set(pages_by_route) - {TableFormerMode.ACCURATE.value} != set()
+        lines = []
+        for timing in self.timings:
+            line = (
+                f"{timing.status:<15} {timing.duration:8.1f}s {timing.pages:5} pages "
+                f"{timing.pages_per_second:6.2f} pages/s {timing.shards:3} shards  "
+            )
+            saved = self.time_saved(timing) if routed else None
+            if saved is not None:
+                routes = "/".join(
+                    f"{timing.route_pages.get(route, 0)}" for route in TABLE_ROUTES
+                )
+                line += f"{routes} pages {saved:+6.1f}s saved  "
+            line += f"{'cached  ' if timing.cached else ''}{timing.source}"
+            lines.append(line + (f"  {timing.error}" if timing.error else ""))
+        pages = sum(timing.pages for timing in self.timings)
+        busy = sum(timing.duration for timing in self.timings)
+        failed = sum(
+            timing.status != ConversionStatus.SUCCESS.value for timing in self.timings
+        )
+        cached = sum(timing.cached for timing in self.timings)
+        lines.append(
+            f"{len(self.timings)} documents, {pages} pages in {self.elapsed:.1f}s "
+            f"with {self.workers} workers: "
+            f"{pages / self.elapsed if self.elapsed else 0.0:.2f} pages/s, "
+            f"{busy:.1f}s of conversion "
+            f"({busy / self.elapsed if self.elapsed else 0.0:.1f}x parallel), "
+            f"{failed} not fully converted, {cached} from cache"
+        )
+        if routed:
+            routed_pages = sum(pages_by_route.values())
+            saved = sum(self.time_saved(timing) or 0.0 for timing in self.timings)
+            lines.append(
+                "Table routes ("
+                + "/".join(TABLE_ROUTES)
+                + "): "
+                + ", ".join(
+                    f"{route} {pages_by_route.get(route, 0) / routed_pages:.0%}"
+                    for route in TABLE_ROUTES
+                )
+                + f", about {saved:.1f}s saved"
+            )
+        return "\n".join(lines)
+
+
+# Converters of this worker process by options. The pool initializer creates
+# the default one, so the layout and TableFormer models are loaded once per
+# worker, not per document; routed pages add one per table route.
+_converters: Dict[ExtractionOptions, DocumentConverter] = {}
+
+
+def _converter_for(options: ExtractionOptions) -> DocumentConverter:
+    if options not in _converters:
+        converter = make_converter(options)
+        converter.initialize_pipeline(InputFormat.PDF)
+        _converters[options] = converter
+    return _converters[options]
+
+
+def _init_worker(options: ExtractionOptions) -> None:
+    _converter_for(options)
+
+
+def _check_in(barrier: Any) -> int:
+    # Holds this worker until every other one has checked in too.
+    barrier.wait()
+    return os.getpid()
+
+
+def output_names(sources: Iterable[str | Path]) -> Dict[str, str]:
+    """Output name (a relative path without suffix) of each source.
+
+    Local files keep their path relative to the directory they all share, so
+    ``a/report.pdf`` and ``b/report.pdf`` don't overwrite each other; URLs use
+    their file name. A name that is still taken gets a ``-2``, ``-3``, ...
+    suffix.
+    """
+    sources = [str(source) for source in sources]
+    local = [Path(source).resolve() for source in sources if Path(source).is_file()]
+    base = os.path.commonpath([path.parent for path in local]) if local else None
+    names: Dict[str, str] = {}
+    taken = set()
+    for source in sources:
+        if source in names:
+            continue
+        if base is not None and Path(source).is_file():
+            name = Path(source).resolve().with_suffix("").relative_to(base).as_posix()
+        else:
+            name = Path(source).stem
+        candidate, suffix = name, 2
+        while candidate in taken:
+            candidate, suffix = f"{name}-{suffix}", suffix + 1
+        taken.add(candidate)
+        names[source] = candidate
+    return names
+
+
+def _write_outputs(document: DoclingDocument, output_dir: Path, name: str) -> None:
+    (output_dir / name).parent.mkdir(parents=True, exist_ok=True)
+    # Section by section, so large documents aren't exported as one string.
+    with open(output_dir / f"{name}.md", "w", encoding="utf-8") as f:
+        write_markdown(document, f)
+    with open(output_dir / f"{name}.json", "w", encoding="utf-8") as f:
+        f.write(document.model_dump_json())
+
+
+def _convert(
+    source: str,
+    output_dir: str,
+    name: str,
+    options: ExtractionOptions,
+    page_range: Optional[Tuple[int, int]] = None,
+) -> Tuple[DocumentTiming, Optional[DoclingDocument]]:
+    """Convert a document, or one shard of it.
+
+    Whole documents are written to ``output_dir`` here; shards are returned to
+    be merged with the rest of their document.
+    """
+    start = time.perf_counter()
+    try:
+        result = _converter_for(options).convert(
+            source, raises_on_error=False, page_range=page_range or DEFAULT_PAGE_RANGE
+        )
+        if page_range is None and result.status != ConversionStatus.FAILURE:
+            _write_outputs(result.document, Path(output_dir), name)
+    except Exception as error:
+        timing = DocumentTiming(
+            source,
+            "failed",
+            0,
+            time.perf_counter() - start,
+            os.getpid(),
+            error=repr(error),
+            output_name=name,
+        )
+        return timing, None
+    duration = time.perf_counter() - start
+    pages = len(result.document.pages)
+    timing = DocumentTiming(
+        source,
+        result.status.value,
+        pages,
+        duration,
+        os.getpid(),
+        error="; ".join(error.error_message for error in result.errors) or None,
+        route_pages={options.table_route: pages},
+        route_seconds={options.table_route: duration},
+        output_name=name,
+    )
+    if page_range is None or result.status == ConversionStatus.FAILURE:
+        return timing, None
+    return timing, result.document
+
+
+def cache_options(
+    options: ExtractionOptions, router: Optional[TableRouter] = None
+) -> Dict[str, Any]:
+    """The options that go into a conversion cache key."""
+    # Threads change the speed, not the output.
+    key_options: Dict[str, Any] = asdict(options)
+    del key_options["num_threads"]
+    if router is not None:
+        key_options["router"] = asdict(router)
+    return key_options
+
+
+def convert_cached(
+    source: str | Path,
+    options: ExtractionOptions = ExtractionOptions(),
+    cache: Optional[ConversionCache] = None,
+) -> DoclingDocument:
+    """Convert one document in this process, or load it from ``cache``.
+
+    Shares cache entries with ``BatchExtractor`` for the same options. Only
+    fully converted documents are stored.
+    """
+    key = None
+    # URLs and missing files go straight to the converter.
+    if cache is not None and Path(source).is_file():
+        key = cache.key(source, cache_options(options))
+        document = cache.load(key)
+        if document is not None:
+            return document
+    result = _converter_for(options).convert(source)
+    if key is not None and result.status == ConversionStatus.SUCCESS:
+        assert cache is not None
+        cache.store(
+            key,
+            result.document,
+            {"source": str(source), "pages": len(result.document.pages)},
+        )
+    return result.document
+
+
+def page_count(source: str | Path) -> int:
+    pdf = pdfium.PdfDocument(source)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def page_ranges(pages: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """1-based inclusive page ranges of at most ``shard_pages`` pages."""
+    return [
+        (first, min(first + shard_pages - 1, pages))
+        for first in range(1, pages + 1, shard_pages)
+    ]
+
+
+def _merge_shards(
+    source: str,
+    name: str,
+    shards: List[Tuple[DocumentTiming, Optional[DoclingDocument]]],
+    output_dir: Path,
+) -> DocumentTiming:
+    """Put a sharded document back together in page order and write it."""
+    documents = [document for _, document in shards if document is not None]
+    statuses = {timing.status for timing, _ in shards}
+    if not documents:
+        status = ConversionStatus.FAILURE.value
+    elif statuses == {ConversionStatus.SUCCESS.value}:
+        status = ConversionStatus.SUCCESS.value
+    else:
+        status = ConversionStatus.PARTIAL_SUCCESS.value
+    route_pages: Dict[str, int] = {}
+    route_seconds: Dict[str, float] = {}
+    for timing, _ in shards:
+        for route, pages in timing.route_pages.items():
+            route_pages[route] = route_pages.get(route, 0) + pages
+            route_seconds[route] = (
+                route_seconds.get(route, 0.0) + timing.route_seconds[route]
+            )
+    # The same error usually repeats for every shard.
+    errors = dict.fromkeys(timing.error for timing, _ in shards if timing.error)
+    if documents and hasattr(DoclingDocument, "concatenate"):
+        # Renumbers pages contiguously, so shards must be in order.
+        document = DoclingDocument.concatenate(documents)
+        document.name = documents[0].name
+        _write_outputs(document, output_dir, name)
+    elif documents:
+        # Older docling-core: no merged document, only its markdown.
+        _log.warning(
+            f"{source}: DoclingDocument.concatenate is unavailable, "
+            "writing markdown only."
+        )
+        (output_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_dir / f"{name}.md", "w", encoding="utf-8") as f:
+            for document in documents:
+                write_markdown(document, f)
+                f.write("\n\n")
+    return DocumentTiming(
+        source,
+        status,
+        sum(timing.pages for timing, _ in shards),
+        sum(timing.duration for timing, _ in shards),
+        os.getpid(),
+        error="; ".join(errors) or None,
+        shards=len(shards),
+        route_pages=route_pages,
+        route_seconds=route_seconds,
+        output_name=name,
+    )
+
+
+def read_sources(path: str | Path) -> List[Path]:
+    """PDFs in a directory, or listed in a manifest file.
+
+    A manifest is either a JSON list of paths or a text file with one path per
+    line; relative paths are relative to the manifest.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(path.rglob("*.pdf"))
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        entries = json.loads(text)
+    else:
+        entries = [
+            line.strip()
+            for line in text.splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+    return [path.parent / entry for entry in entries]
+
+
+class BatchExtractor:
+    """Convert many documents with a pool of docling converter processes.
+
+    Each worker builds its own ``DocumentConverter`` once and converts one
+    document at a time, writing ``<name>.md`` and ``<name>.json`` to the output
+    directory (see ``output_names``). By default there are as many workers as
+    fit the cores at ``options.num_threads`` threads each. If a worker dies,
+    e.g. out of memory, the pool is restarted and the documents it took down
+    are converted again one at a time; a document that kills a worker again
+    is recorded as failed.
+
+    With ``shard_pages`` set, PDFs longer than that are split into page ranges
+    that are converted by different workers and merged back in page order, so
+    one large document also uses all workers (e.g. pages / workers for a
+    single document).
+
+    With a ``cache``, documents whose content and pipeline options are
+    unchanged are copied from the cache instead of being converted again.
+
+    With a ``router``, a quick pdfium pass picks the table-structure route of
+    every page: runs of pages without tables skip table structure, simple
+    tables use FAST and only the rest use ACCURATE. Each run is converted as
+    its own shard with the matching options.
+    """
+
+    def __init__(
+        self,
+        options: ExtractionOptions = ExtractionOptions(),
+        workers: Optional[int] = None,
+        shard_pages: Optional[int] = None,
+        cache: Optional[ConversionCache] = None,
+        router: Optional[TableRouter] = None,
+    ) -> None:
+        self.options = options
+        self.workers = workers or max(1, (os.cpu_count() or 1) // options.num_threads)
+        self.shard_pages = shard_pages
+        self.cache = cache
+        self.router = router
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BatchExtractor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        if self._pool is None:
+            # Torch and forked processes don't mix.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.options,),
+            )
+
+    def warm_up(self) -> None:
+        """Start every worker and load its models before timing anything."""
+        self.start()
+        assert self._pool is not None
+        # A task only returns once all workers have picked one up, so no
+        # worker can take a second one and each task needs its own worker.
+        with multiprocessing.get_context("spawn").Manager() as manager:
+            barrier = manager.Barrier(self.workers)
+            futures = [
+                self._pool.submit(_check_in, barrier) for _ in range(self.workers)
+            ]
+            for future in futures:
+                future.result()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _restart(self) -> None:
+        assert self._pool is not None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self.start()
+
+    def _shards(
+        self, source: str | Path
+    ) -> List[Tuple[ExtractionOptions, Optional[Tuple[int, int]]]]:
+        whole = [(self.options, None)]
+        if (self.shard_pages is None and self.router is None) or Path(
+            source
+        ).suffix.lower() != ".pdf":
+            return whole
+        try:
+            if self.router is not None:
+                routes = self.router.page_routes(source)
+                ranges = route_ranges(routes, self.router.min_run_pages)
+            else:
+                ranges = [(self.options.table_route, (1, page_count(source)))]
+        except Exception:
+            # Let the converter report unreadable files.
+            return whole
+        shards: List[Tuple[ExtractionOptions, Optional[Tuple[int, int]]]] = []
+        for route, (first, last) in ranges:
+            options = self.options.for_route(route)
+            shard_pages = self.shard_pages or last - first + 1
+            shards.extend(
+                (options, (first + start - 1, first + end - 1))
+                for start, end in page_ranges(last - first + 1, shard_pages)
+            )
+        if len(shards) == 1:
+            return [(shards[0][0], None)]
+        return shards
+
+    def _cache_options(self) -> Dict[str, Any]:
+        return cache_options(self.options, self.router)
+
+    def _store(
+        self, key: str, source: str, timing: DocumentTiming, output_dir: Path
+    ) -> None:
+        assert self.cache is not None and timing.output_name is not None
+        markdown_path = output_dir / f"{timing.output_name}.md"
+        json_path = output_dir / f"{timing.output_name}.json"
+        # Merged shards without concatenate only have markdown.
+        if json_path.exists():
+            self.cache.put(
+                key,
+                markdown_path,
+                json_path,
+                {"source": source, "pages": timing.pages},
+            )
+
+    def _submit(
+        self, source: str, output_dir: Path, name: str
+    ) -> List[Future[Tuple[DocumentTiming, Optional[DoclingDocument]]]]:
+        assert self._pool is not None
+        return [
+            self._pool.submit(_convert, source, str(output_dir), name, *shard)
+            for shard in self._shards(source)
+        ]
+
+    def _collect(
+        self,
+        source: str,
+        name: str,
+        futures: List[Future[Tuple[DocumentTiming, Optional[DoclingDocument]]]],
+        output_dir: Path,
+    ) -> DocumentTiming:
+        results = [future.result() for future in futures]
+        if len(results) == 1:
+            return results[0][0]
+        return _merge_shards(source, name, results, output_dir)
+
+    def _record(
+        self,
+        timing: DocumentTiming,
+        key: Optional[str],
+        timings: List[DocumentTiming],
+        output_dir: Path,
+    ) -> None:
+        _log.info(f"{timing.source}: {timing.status} in {timing.duration:.2f} seconds.")
+        timings.append(timing)
+        if key is not None and timing.status == ConversionStatus.SUCCESS.value:
+            self._store(key, timing.source, timing, output_dir)
+
+    def extract(
+        self,
+        sources: Iterable[str | Path],
+        output_dir: str | Path = "extracted",
+        names: Optional[Mapping[str, str]] = None,
+    ) -> BatchReport:
+        """Convert ``sources``; ``names`` overrides their ``output_names``."""
+        self.start()
+        assert self._pool is not None
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        output_dir = Path(output_dir)
+        start = time.perf_counter()
+        sources = [str(source) for source in sources]
+        names = names or output_names(sources)
+        timings: List[DocumentTiming] = []
+        pending: List[Tuple[str, Optional[str]]] = []
+        for source in sources:
+            key = None
+            # URLs and missing files go straight to the converter.
+            if self.cache is not None and Path(source).is_file():
+                lookup_start = time.perf_counter()
+                key = self.cache.key(source, self._cache_options())
+                pages = self.cache.restore(key, output_dir, names[source])
+                if pages is not None:
+                    timings.append(
+                        DocumentTiming(
+                            source,
+                            ConversionStatus.SUCCESS.value,
+                            pages,
+                            time.perf_counter() - lookup_start,
+                            os.getpid(),
+                            cached=True,
+                            output_name=names[source],
+                        )
+                    )
+                    continue
+            pending.append((source, key))
+        jobs = [
+            (source, key, self._submit(source, output_dir, names[source]))
+            for source, key in pending
+        ]
+        broken: List[Tuple[str, Optional[str]]] = []
+        for source, key, futures in jobs:
+            try:
+                timing = self._collect(source, names[source], futures, output_dir)
+            except BrokenProcessPool:
+                # Every document in flight fails with the one that killed its
+                # worker; retried below.
+                broken.append((source, key))
+                continue
+            self._record(timing, key, timings, output_dir)
+        if broken:
+            _log.warning(
+                f"A worker died; retrying {len(broken)} documents one at a time."
+            )
+            self._restart()
+        # One document at a time, so only the one that kills a worker fails.
+        for source, key in broken:
+            try:
+                timing = self._collect(
+                    source,
+                    names[source],
+                    self._submit(source, output_dir, names[source]),
+                    output_dir,
+                )
+            except BrokenProcessPool as error:
+                timing = DocumentTiming(
+                    source,
+                    "failed",
+                    0,
+                    0.0,
+                    os.getpid(),
+                    error=repr(error),
+                    output_name=names[source],
+                )
+                self._restart()
+            self._record(timing, key, timings, output_dir)
+        return BatchReport(timings, self.workers, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Convert PDFs with docling.")
+    parser.add_argument("source", help="Directory of PDFs or manifest file.")
+    parser.add_argument("--output-dir", default="extracted")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads-per-worker", type=int, default=4)
+    parser.add_argument(
+        "--table-mode",
+        choices=[mode.value for mode in TableFormerMode],
+        default=TableFormerMode.ACCURATE.value,
+    )
+    parser.add_argument("--no-cell-matching", action="store_true")
+    parser.add_argument(
+        "--shard-pages",
+        type=int,
+        help="Split PDFs longer than this into page ranges converted in parallel.",
+    )
+    parser.add_argument(
+        "--route-tables",
+        action="store_true",
+        help="Use ACCURATE table structure only on pages that need it.",
+    )
+    parser.add_argument(
+        "--combined-output",
+        help="Also write all converted documents into this one markdown file.",
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--cache-size-mb", type=int, default=2048)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    options = ExtractionOptions(
+        table_mode=TableFormerMode(args.table_mode),
+        do_cell_matching=not args.no_cell_matching,
+        num_threads=args.threads_per_worker,
+    )
+    cache = None
+    if not args.no_cache:
+        cache = ConversionCache(args.cache_dir, args.cache_size_mb * 1024 * 1024)
+    router = TableRouter() if args.route_tables else None
+    with BatchExtractor(
+        options, args.workers, args.shard_pages, cache, router
+    ) as extractor:
+        report = extractor.extract(read_sources(args.source), args.output_dir)
+    print(report)
+    if args.combined_output:
+        json_paths = [
+            Path(args.output_dir) / f"{timing.output_name}.json"
+            for timing in report.timings
+            if timing.status not in (ConversionStatus.FAILURE.value, "failed")
+        ]
+        # Merged shards without concatenate have no JSON to read back.
+        combine_documents(
+            [path for path in json_paths if path.exists()], args.combined_output
+        )
+    if cache is not None:
+        print(cache.stats)
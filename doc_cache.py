@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from docling_core.types.doc import DoclingDocument
+
+from markdown_export import write_markdown
+
+DEFAULT_CACHE_DIR = ".doc_cache"
+
+
+def _version(package: str) -> Optional[str]:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+# A new docling release can change the output for the same input.
+DOCLING_VERSIONS = {
+    package: _version(package)
+    for package in ("docling", "docling-slim", "docling-core", "docling-ibm-models")
+}
+
+
+def file_hash(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(content_hash: str, options: Mapping[str, Any]) -> str:
+    payload = {
+        "content": content_hash,
+        "options": options,
+        "versions": DOCLING_VERSIONS,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ConversionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evicted: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"Conversion cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evicted} evicted"
+        )
+
+
+class ConversionCache:
+    """Converted documents on disk, keyed by file content and pipeline options.
+
+    Each entry is a directory with the serialized ``DoclingDocument``
+    (``document.json``), its markdown (``document.md``) and ``meta.json``.
+    Entries are written to a temporary directory and renamed into place. When
+    the entries exceed ``max_bytes`` the least recently used ones are removed.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = 2 * 1024**3,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self.stats = ConversionCacheStats()
+
+    def key(self, source: str | Path, options: Mapping[str, Any]) -> str:
+        return cache_key(file_hash(source), options)
+
+    def restore(self, key: str, output_dir: Path, name: str) -> Optional[int]:
+        """Copy a cached document to ``<output_dir>/<name>.md`` and ``.json``.
+
+        Returns its page count, or ``None`` on a miss.
+        """
+        entry = self._directory / key
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+            (output_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry / "document.md", output_dir / f"{name}.md")
+            shutil.copyfile(entry / "document.json", output_dir / f"{name}.json")
+        except FileNotFoundError:
+            # Missing, or evicted by another process meanwhile.
+            self.stats.misses += 1
+            return None
+        # The meta file's mtime marks the last use, for eviction.
+        os.utime(entry / "meta.json")
+        self.stats.hits += 1
+        return meta["pages"]
+
+    def load(self, key: str) -> Optional[DoclingDocument]:
+        """The cached document, or ``None``."""
+        entry = self._directory / key
+        try:
+            text = (entry / "document.json").read_text(encoding="utf-8")
+            os.utime(entry / "meta.json")
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return DoclingDocument.model_validate_json(text)
+
+    def put(
+        self,
+        key: str,
+        markdown_path: Path,
+        json_path: Path,
+        meta: Dict[str, Any],
+    ) -> None:
+        entry = self._directory / key
+        if entry.exists():
+            return
+        tmp_entry = self._directory / f".{key}.{uuid.uuid4().hex}"
+        tmp_entry.mkdir()
+        shutil.copyfile(markdown_path, tmp_entry / "document.md")
+        shutil.copyfile(json_path, tmp_entry / "document.json")
+        self._commit(key, tmp_entry, meta)
+
+    def store(self, key: str, document: DoclingDocument, meta: Dict[str, Any]) -> None:
+        """Like ``put``, for a document that hasn't been written out."""
+        entry = self._directory / key
+        if entry.exists():
+            return
+        tmp_entry = self._directory / f".{key}.{uuid.uuid4().hex}"
+        tmp_entry.mkdir()
+        with open(tmp_entry / "document.md", "w", encoding="utf-8") as f:
+            write_markdown(document, f)
+        with open(tmp_entry / "document.json", "w", encoding="utf-8") as f:
+            f.write(document.model_dump_json())
+        self._commit(key, tmp_entry, meta)
+
+    def _commit(self, key: str, tmp_entry: Path, meta: Dict[str, Any]) -> None:
+        entry = self._directory / key
+        (tmp_entry / "meta.json").write_text(
+            json.dumps({**meta, "stored_at": time.time()}), encoding="utf-8"
+        )
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another process stored the same key first.
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in self._directory.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(path.stat().st_size for path in entry.iterdir())
+                last_used = (entry / "meta.json").stat().st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((last_used, size, entry))
+            total += size
+        for _, size, entry in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self.stats.evicted += 1
+
+    def clear(self) -> None:
+        shutil.rmtree(self._directory, ignore_errors=True)
+        self._directory.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,140 @@
+import re
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import List, Tuple
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from docling.datamodel.pipeline_options import TableFormerMode
+
+# Pages routed here are converted without table structure at all.
+NO_TABLES = "none"
+TABLE_ROUTES = (NO_TABLES, TableFormerMode.FAST.value, TableFormerMode.ACCURATE.value)
+
+_CAPTION = re.compile(r"^\s*Table\s+[0-9IVX]+", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass
+class PageFeatures:
+    """Cheap signs of a table on one page, read with pdfium."""
+
+    horizontal_rules: int = 0
+    vertical_rules: int = 0
+    # Text lines split into three or more cells by wide gaps.
+    multi_column_rows: int = 0
+    caption: bool = False
+
+
+def _rules(
+    page: pdfium.PdfPage, min_length: float, max_width: float
+) -> Tuple[int, int]:
+    horizontal = vertical = 0
+    for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH]):
+        left, bottom, right, top = obj.get_bounds()
+        width, height = right - left, top - bottom
+        if height <= max_width and width >= min_length:
+            horizontal += 1
+        elif width <= max_width and height >= min_length:
+            vertical += 1
+    return horizontal, vertical
+
+
+def _multi_column_rows(
+    textpage: pdfium.PdfTextPage, min_gap: float, row_tolerance: float
+) -> int:
+    rects = [textpage.get_rect(i) for i in range(textpage.count_rects())]
+    # Group text segments into rows by their baseline.
+    rects.sort(key=lambda rect: (-round(rect[1] / row_tolerance), rect[0]))
+    rows = 0
+    for _, row in groupby(rects, key=lambda rect: round(rect[1] / row_tolerance)):
+        segments = sorted(row)
+        cells = 1 + sum(
+            right_segment[0] - left_segment[2] >= min_gap
+            for left_segment, right_segment in zip(segments, segments[1:])
+        )
+        rows += cells >= 3
+    return rows
+
+
+@dataclass
+class TableRouter:
+    """Pick the table-structure route for each page of a PDF.
+
+    Pages with no ruling lines, no column-aligned text and no "Table n"
+    caption skip table structure; pages with small, borderless tables use
+    TableFormer's FAST mode; everything else keeps ACCURATE. When in doubt a
+    page goes to the more accurate mode.
+    """
+
+    # Ruling lines: at least this long (pt) and at most this thick.
+    min_rule_length: float = 20.0
+    max_rule_width: float = 3.0
+    # Gap (pt) between text segments that separates table cells.
+    min_cell_gap: float = 12.0
+    row_tolerance: float = 3.0
+    # Up to this many aligned rows, without vertical rules, is a simple table.
+    max_simple_rows: int = 8
+    max_simple_rules: int = 6
+    # Shorter runs of pages are merged into a neighbouring route.
+    min_run_pages: int = 3
+
+    def features(self, page: pdfium.PdfPage) -> PageFeatures:
+        horizontal, vertical = _rules(page, self.min_rule_length, self.max_rule_width)
+        textpage = page.get_textpage()
+        try:
+            rows = _multi_column_rows(textpage, self.min_cell_gap, self.row_tolerance)
+            caption = bool(_CAPTION.search(textpage.get_text_range()))
+        finally:
+            textpage.close()
+        return PageFeatures(horizontal, vertical, rows, caption)
+
+    def route(self, features: PageFeatures) -> str:
+        rules = features.horizontal_rules + features.vertical_rules
+        if not features.caption and rules < 2 and features.multi_column_rows < 3:
+            return NO_TABLES
+        if (
+            features.vertical_rules == 0
+            and rules <= self.max_simple_rules
+            and features.multi_column_rows <= self.max_simple_rows
+        ):
+            return TableFormerMode.FAST.value
+        return TableFormerMode.ACCURATE.value
+
+    def page_routes(self, source: str | Path) -> List[str]:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            routes = []
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    routes.append(self.route(self.features(page)))
+                finally:
+                    page.close()
+            return routes
+        finally:
+            pdf.close()
+
+
+def route_ranges(
+    routes: List[str], min_run: int = 1
+) -> List[Tuple[str, Tuple[int, int]]]:
+    """Runs of consecutive pages with the same route, as 1-based page ranges.
+
+    Each run is converted separately, so runs shorter than ``min_run`` pages
+    are given the most accurate route among them and their neighbours.
+    """
+    runs = [(route, len(list(run))) for route, run in groupby(routes)]
+    smoothed: List[str] = []
+    for index, (route, length) in enumerate(runs):
+        if length < min_run:
+            neighbours = runs[max(index - 1, 0) : index + 2]
+            route = max((route for route, _ in neighbours), key=TABLE_ROUTES.index)
+        smoothed.extend([route] * length)
+    ranges = []
+    first = 1
+    for route, run in groupby(smoothed):
+        last = first + len(list(run)) - 1
+        ranges.append((route, (first, last)))
+        first = last + 1
+    return ranges
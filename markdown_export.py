@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Set, TextIO
+
+from docling_core.transforms.serializer.base import SerializationResult
+from docling_core.transforms.serializer.markdown import (
+    MarkdownDocSerializer,
+    MarkdownParams,
+)
+from docling_core.types.doc import (
+    DoclingDocument,
+    SectionHeaderItem,
+    TitleItem,
+)
+
+# Written between documents in a combined file; an HTML comment, so it doesn't
+# show when the markdown is rendered.
+DOCUMENT_BOUNDARY = "<!-- document: {name} -->"
+
+
+def iter_markdown(
+    document: DoclingDocument, params: Optional[MarkdownParams] = None
+) -> Iterator[str]:
+    """Yield the document's markdown one section at a time.
+
+    Joined with blank lines the sections give the same markdown as
+    ``export_to_markdown`` with the same parameters. One serializer walks the
+    body once; a section ends before each heading directly under the body, so
+    lists and other groups are never split.
+    """
+    serializer = MarkdownDocSerializer(doc=document, params=params or MarkdownParams())
+    if serializer.requires_page_break() or document.body.meta:
+        # Page breaks and body meta are only added by a whole-document pass.
+        markdown = serializer.serialize().text
+        if markdown:
+            yield markdown
+        return
+
+    kwargs = serializer.params.model_dump()
+    visited: Set[str] = set()
+    parts: List[SerializationResult] = []
+    for item, level in document.iterate_items(
+        with_groups=True,
+        traverse_pictures=serializer.params.traverse_pictures,
+        included_content_layers=serializer.params.layers,
+    ):
+        if item.self_ref in visited:
+            continue
+        visited.add(item.self_ref)
+        if parts and level == 1 and isinstance(item, (SectionHeaderItem, TitleItem)):
+            yield serializer.serialize_doc(parts=parts).text
+            parts = []
+        part = serializer.serialize(item=item, visited=visited, level=level, **kwargs)
+        if part.text:
+            parts.append(part)
+    if parts:
+        yield serializer.serialize_doc(parts=parts).text
+
+
+def write_markdown(
+    document: DoclingDocument, f: TextIO, params: Optional[MarkdownParams] = None
+) -> int:
+    """Write the document's markdown to ``f`` section by section.
+
+    Returns the number of characters written.
+    """
+    written = 0
+    for index, markdown in enumerate(iter_markdown(document, params)):
+        if index:
+            written += f.write("\n\n")
+        written += f.write(markdown)
+    return written
+
+
+class MarkdownWriter:
+    """Write many documents into one markdown file, one section at a time.
+
+    Each document starts with a ``DOCUMENT_BOUNDARY`` line naming it, so the
+    combined file can be split again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = "w",
+        boundary: Optional[str] = DOCUMENT_BOUNDARY,
+        params: Optional[MarkdownParams] = None,
+    ) -> None:
+        self._file = open(path, mode, encoding="utf-8")
+        self._boundary = boundary
+        self._params = params
+        self._documents = 0
+
+    def __enter__(self) -> "MarkdownWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, document: DoclingDocument, name: Optional[str] = None) -> None:
+        if self._documents:
+            self._file.write("\n")
+        if self._boundary is not None:
+            self._file.write(self._boundary.format(name=name or document.name))
+            self._file.write("\n\n")
+        write_markdown(document, self._file, self._params)
+        self._file.write("\n")
+        self._documents += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def combine_documents(
+    json_paths: Iterable[str | Path],
+    output_path: str | Path,
+    params: Optional[MarkdownParams] = None,
+) -> None:
+    """Write the documents saved as ``model_dump_json`` files into one file.
+
+    Loads one document at a time.
+    """
+    with MarkdownWriter(output_path, params=params) as writer:
+        for json_path in json_paths:
+            document = DoclingDocument.model_validate_json(
+                Path(json_path).read_text(encoding="utf-8")
+            )
+            writer.write(document, Path(json_path).stem)
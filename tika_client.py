@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Iterable, List, Literal, Mapping, Optional
+from urllib.parse import quote
+
+import httpx
+from docling.datamodel.base_models import ConversionStatus
+
+from doc_batch import BatchExtractor, output_names
+
+_log = logging.getLogger(__name__)
+
+# The tika service in docker-compose.yml.
+DEFAULT_TIKA_URL = "http://localhost:9998"
+
+Backend = Literal["tika", "docling"]
+
+
+@dataclass
+class ExtractionResult:
+    source: str
+    backend: Backend
+    status: Literal["success", "failed"]
+    duration: float
+    # Bytes of extracted text or markdown written.
+    size: int = 0
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _content_disposition(filename: str) -> str:
+    # Header values must be ASCII: a plain fallback name for servers that
+    # ignore the RFC 5987 form, which carries the exact one.
+    fallback = "".join(
+        char if char.isascii() and char.isprintable() and char not in '"\\' else "_"
+        for char in filename
+    )
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+async def _file_chunks(f: BinaryIO, chunk_size: int) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(f.read, chunk_size):
+        yield chunk
+
+
+class TikaClient:
+    """Async client for a local Apache Tika server.
+
+    Requests share one pool of keep-alive connections, and at most
+    ``max_in_flight`` are sent at once. Files are streamed to ``PUT /tika``
+    in chunks rather than read into memory, and the plain text is written to
+    ``<name>.txt`` in the output directory, named like ``BatchExtractor``
+    outputs.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_TIKA_URL,
+        max_in_flight: int = 8,
+        timeout: float = 300.0,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_in_flight,
+            ),
+        )
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._chunk_size = chunk_size
+
+    async def __aenter__(self) -> "TikaClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def available(self) -> bool:
+        try:
+            response = await self._client.get("/tika")
+        except httpx.HTTPError:
+            return False
+        return response.status_code == 200
+
+    async def extract_text(self, source: str | Path) -> str:
+        path = Path(source)
+        # Opened before the request, so a missing file fails here and not
+        # halfway through the upload.
+        async with self._slots:
+            with open(path, "rb") as f:
+                response = await self._client.put(
+                    "/tika",
+                    content=_file_chunks(f, self._chunk_size),
+                    headers={
+                        "Accept": "text/plain; charset=UTF-8",
+                        # Helps Tika's type detection, which otherwise only
+                        # sees the bytes.
+                        "Content-Disposition": _content_disposition(path.name),
+                    },
+                )
+        response.raise_for_status()
+        return response.text
+
+    async def extract(
+        self,
+        source: str | Path,
+        output_dir: str | Path = "extracted",
+        name: Optional[str] = None,
+    ) -> ExtractionResult:
+        start = time.perf_counter()
+        try:
+            text = await self.extract_text(source)
+        except Exception as error:
+            # Any error fails this document only, so the rest of the batch
+            # and the fallback still run.
+            return ExtractionResult(
+                str(source),
+                "tika",
+                "failed",
+                time.perf_counter() - start,
+                error=repr(error),
+            )
+        if not text.strip():
+            # Usually a scanned PDF without a text layer.
+            return ExtractionResult(
+                str(source),
+                "tika",
+                "failed",
+                time.perf_counter() - start,
+                error="No text extracted",
+            )
+        output = Path(output_dir) / f"{name or Path(source).stem}.txt"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        size = await asyncio.to_thread(output.write_bytes, text.encode("utf-8"))
+        return ExtractionResult(
+            str(source),
+            "tika",
+            "success",
+            time.perf_counter() - start,
+            size=size,
+            output=str(output),
+        )
+
+    async def extract_all(
+        self,
+        sources: Iterable[str | Path],
+        output_dir: str | Path = "extracted",
+        names: Optional[Mapping[str, str]] = None,
+    ) -> List[ExtractionResult]:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        sources = list(sources)
+        names = names or output_names(sources)
+        return list(
+            await asyncio.gather(
+                *(
+                    self.extract(source, output_dir, names[str(source)])
+                    for source in sources
+                )
+            )
+        )
+
+
+def docling_extract(
+    extractor: BatchExtractor,
+    sources: List[str],
+    output_dir: str | Path,
+    names: Optional[Mapping[str, str]] = None,
+) -> List[ExtractionResult]:
+    """Run ``extractor`` and describe its documents as extraction results."""
+    report = extractor.extract(sources, output_dir, names)
+    results = []
+    for timing in report.timings:
+        output = Path(output_dir) / f"{timing.output_name}.md"
+        failed = timing.status in (ConversionStatus.FAILURE.value, "failed")
+        results.append(
+            ExtractionResult(
+                timing.source,
+                "docling",
+                "failed" if failed else "success",
+                timing.duration,
+                size=0 if failed else output.stat().st_size,
+                output=None if failed else str(output),
+                error=timing.error,
+            )
+        )
+    return results
+
+
+async def extract_documents(
+    sources: Iterable[str | Path],
+    tika: TikaClient,
+    extractor: BatchExtractor,
+    output_dir: str | Path = "extracted",
+    prefer: Backend = "tika",
+) -> List[ExtractionResult]:
+    """Extract with the preferred backend, retrying failures with the other.
+
+    Tika is cheap plain-text extraction for bulk corpora; docling gives
+    structured markdown (tables, headings) at a much higher cost. Documents
+    the preferred backend can't handle (Tika down or no text layer, docling
+    failures or unsupported formats) go to the other one. If the Tika server
+    isn't reachable everything goes to docling.
+    """
+    sources = [str(source) for source in sources]
+    # Named once for the whole set, so a retried document is written under the
+    # same name by either backend.
+    names = output_names(sources)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tika_up = await tika.available()
+    if not tika_up:
+        _log.warning("Tika server is not reachable, using docling only.")
+
+    async def run(backend: Backend, batch: List[str]) -> List[ExtractionResult]:
+        if not batch:
+            return []
+        if backend == "tika":
+            return await tika.extract_all(batch, output_dir, names)
+        # The batch extractor blocks while its pool converts.
+        return await asyncio.to_thread(
+            docling_extract, extractor, batch, output_dir, names
+        )
+
+    first: Backend = prefer if tika_up else "docling"
+    second: Optional[Backend] = None
+    if tika_up:
+        second = "docling" if first == "tika" else "tika"
+    results = {result.source: result for result in await run(first, sources)}
+    retry = [source for source in sources if results[source].status == "failed"]
+    if second is not None:
+        for result in await run(second, retry):
+            if result.status == "success":
+                results[result.source] = result
+    return [results[source] for source in sources]
+
+
+def report(results: List[ExtractionResult], elapsed: float) -> str:
+    lines = [
+        f"{result.backend:<8} {result.status:<8} {result.duration:8.2f}s "
+        f"{result.size:9} bytes  {result.source}"
+        + (f"  {result.error}" if result.error else "")
+        for result in results
+    ]
+    by_backend = {
+        backend: sum(
+            result.backend == backend and result.status == "success"
+            for result in results
+        )
+        for backend in ("tika", "docling")
+    }
+    failed = sum(result.status == "failed" for result in results)
+    lines.append(
+        f"{len(results)} documents in {elapsed:.1f}s: "
+        f"{by_backend['tika']} tika, {by_backend['docling']} docling, "
+        f"{failed} failed"
+    )
+    return "\n".join(lines)